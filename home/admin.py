@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
+from .jobs import queue_stats
+from .throttle import throttle_stats
+from .webhooks import schedule_delivery, stalled_deliveries
 from .models import *
 
 @admin.register(SiteConfiguration)
@@ -80,11 +84,86 @@ class TestimonialAdmin(admin.ModelAdmin):
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'subject', 'is_read', 'created_at']
-    list_filter = ['is_read', 'created_at']
+    list_display = ['name', 'email', 'subject', 'is_read', 'emailed', 'created_at']
+    list_filter = ['is_read', 'notification__status', 'created_at']
     list_editable = ['is_read']
     search_fields = ['name', 'email', 'subject']
     readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
+    list_select_related = ['notification']
     
     def has_add_permission(self, request):
-        return False
\ No newline at end of file
+        return False
+    
+    @admin.display(description='Email')
+    def emailed(self, obj):
+        notification = getattr(obj, 'notification', None)
+        return notification.get_status_display() if notification else '-'
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), 'throttle_stats': throttle_stats()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'created_at', 'wait_time', 'run_time']
+    list_filter = ['status', 'task']
+    readonly_fields = [f.name for f in Job._meta.fields]
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.display(description='Waited')
+    def wait_time(self, obj):
+        if obj.started_at:
+            return obj.started_at - obj.created_at
+        return None
+    
+    @admin.display(description='Ran for')
+    def run_time(self, obj):
+        if obj.started_at and obj.finished_at and obj.status == 'done':
+            return obj.finished_at - obj.started_at
+        return None
+    
+    @admin.action(description='Retry selected jobs')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status='running').update(status='queued', run_after=timezone.now())
+        self.message_user(request, f'{count} jobs queued again')
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), 'queue_stats': queue_stats()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+@admin.register(GitHubRepository)
+class GitHubRepositoryAdmin(admin.ModelAdmin):
+    list_display = ['full_name', 'project', 'pushed_at', 'synced_at']
+    search_fields = ['full_name']
+    readonly_fields = ['repo_id', 'full_name', 'pushed_at', 'repo_updated_at', 'content_hash', 'synced_at']
+    fields = ['project', *readonly_fields]
+    
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['delivery_id', 'event', 'repository', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event']
+    search_fields = ['delivery_id']
+    readonly_fields = [f.name for f in WebhookDelivery._meta.fields]
+    actions = ['process_again']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.display(description='Repository')
+    def repository(self, obj):
+        return (obj.payload.get('repository') or {}).get('full_name', '')
+    
+    @admin.action(description='Process selected deliveries again')
+    def process_again(self, request, queryset):
+        # A delivery still being applied is left alone unless its worker has died
+        deliveries = list(queryset.exclude(status='processing') | queryset.filter(pk__in=stalled_deliveries()))
+        WebhookDelivery.objects.filter(pk__in=[d.pk for d in deliveries]).update(status='pending', attempts=0)
+        for delivery in deliveries:
+            schedule_delivery(delivery)
+        self.message_user(request, f'{len(deliveries)} deliveries queued again')
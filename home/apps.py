@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class HomeConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'home'
+
+    def ready(self):
+        # Connect cache invalidation receivers and register background tasks
+        from . import signals  # noqa: F401
+        from . import notifications, webhooks  # noqa: F401
@@ -0,0 +1,152 @@
+"""Page caching for the public portfolio, invalidated by content version stamps (see ``home/signals.py``)."""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import SiteConfiguration
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 15)
+PAGE_CACHE_PREFIX = 'portfolio:page'
+VERSION_KEY_PREFIX = 'portfolio:version'
+VERSION_CACHE_ALIAS = getattr(settings, 'VERSION_CACHE_ALIAS', 'default')
+
+# (version, instance) of the SiteConfiguration loaded by this process
+_site_config = None
+
+
+def get_version(name):
+    """Return the current version stamp for ``name``, creating it if needed"""
+    versions = caches[VERSION_CACHE_ALIAS]
+    key = f'{VERSION_KEY_PREFIX}:{name}'
+    version = versions.get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() so that concurrent first readers agree on a single stamp
+        if not versions.add(key, version, None):
+            version = versions.get(key, version)
+    return version
+
+
+def bump_version(*names):
+    """Invalidate everything cached under the given version names"""
+    stamp = time.time_ns()
+    caches[VERSION_CACHE_ALIAS].set_many({f'{VERSION_KEY_PREFIX}:{name}': stamp for name in names}, None)
+
+
+def get_site_config():
+    """Get or create site configuration singleton, cached per process"""
+    global _site_config
+    version = get_version('site_config')
+    cached = _site_config
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # Grab the singleton if it exists, otherwise create the very first one
+    config = SiteConfiguration.objects.first()
+    if config is None:
+        config = SiteConfiguration.objects.create(
+            site_name='Bikal Sharma Pokharel',
+            tagline='Aspiring Data Scientist | AI/ML Enthusiast | Backend Developer',
+            bio='''BSc Computer Science Student passionate about solving real-world problems 
+                     through technology. Experienced in full-stack development, machine learning, 
+                     and digital marketing.''',
+            email='pokharelbikalsharma@gmail.com',
+            location='Nepal',
+            years_experience=2
+        )
+
+    _site_config = (version, config)
+    return config
+
+
+def has_pending_messages(request):
+    """Check for flash messages without marking them as consumed"""
+    return len(get_messages(request)) > 0
+
+
+def page_cache_key(request, with_messages=False):
+    """Build the cache key for a public page request"""
+    url = request.build_absolute_uri()
+    flag = 'm' if with_messages else '-'
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{get_version("pages")}:{flag}:{digest}'
+
+
+def cache_public_page(view_func):
+    """
+    Serve a public page from the cache, rendering it only on a miss.
+
+    Only anonymous GET/HEAD requests that produce a 200 are stored. Pages
+    carrying a flash message are keyed separately and never stored, since the
+    message belongs to a single visitor.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        with_messages = has_pending_messages(request)
+        key = page_cache_key(request, with_messages)
+        response = None if with_messages else cache.get(key)
+        if response is not None:
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200 and not with_messages:
+            cache.set(key, response, PAGE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def conditional_page(rows):
+    """
+    Answer conditional GETs for a public page with 304 Not Modified.
+
+    ``rows(request, *args, **kwargs)`` returns the queryset rendered by the
+    view. Its newest ``updated_at`` and the page and site configuration
+    version stamps make up the ETag and Last-Modified validators, computed
+    with a single aggregate per request.
+    """
+    def validators(request, *args, **kwargs):
+        cached = getattr(request, '_page_validators', None)
+        if cached is not None:
+            return cached
+        if has_pending_messages(request):
+            cached = (None, None)
+        else:
+            newest = rows(request, *args, **kwargs).aggregate(newest=Max('updated_at'))['newest']
+            pages_version = get_version('pages')
+            config_version = get_version('site_config')
+            # Stamps are taken from time.time_ns() when content changes
+            changed = datetime.fromtimestamp(max(pages_version, config_version) / 1e9, tz=timezone.utc)
+            last_modified = max(newest, changed) if newest else changed
+            etag = hashlib.md5(f'{newest}:{pages_version}:{config_version}'.encode('utf-8')).hexdigest()
+            cached = (etag, last_modified)
+        request._page_validators = cached
+        return cached
+
+    def decorator(view_func):
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: validators(request, *args, **kwargs)[1],
+        )(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Let browsers keep the page but revalidate it on every visit
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
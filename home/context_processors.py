@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_site_config, get_version
+
+
+def site_config(request):
+    """Expose the cached SiteConfiguration to every template as ``config``"""
+    return {'config': SimpleLazyObject(get_site_config)}
+
+
+def model_versions(request):
+    """Expose per-model version stamps used to key cached template fragments"""
+    return {'model_versions': SimpleLazyObject(lambda: {
+        'skill': get_version('model:skill'),
+    })}
@@ -0,0 +1,199 @@
+"""A small GitHub REST API client with pagination, conditional requests and rate-limit handling."""
+import base64
+import binascii
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import caches
+
+API_URL = getattr(settings, 'GITHUB_API_URL', 'https://api.github.com')
+GITHUB_CACHE_ALIAS = getattr(settings, 'GITHUB_CACHE_ALIAS', 'shared')
+GITHUB_MAX_WAIT = getattr(settings, 'GITHUB_MAX_WAIT', 15 * 60)
+GITHUB_MAX_RETRIES = getattr(settings, 'GITHUB_MAX_RETRIES', 4)
+GITHUB_WORKERS = getattr(settings, 'GITHUB_WORKERS', 8)
+
+# Conditional request state is kept for a month
+CONDITIONAL_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    pass
+
+
+class DictStore(dict):
+    """Cache-like dict, e.g. to keep a repository's validators on its sync state row"""
+
+    def set(self, key, value, timeout=None):
+        self[key] = value
+
+
+class GitHubClient:
+    """Conditional, paginated, rate-limit-aware access to the GitHub API"""
+
+    def __init__(self, token=None, api_url=API_URL, session=None, sleep=time.sleep, pool_size=GITHUB_WORKERS):
+        self.api_url = api_url.rstrip('/')
+        if session is None:
+            # Keep one connection per worker thread alive between requests
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session = session
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'portfolio-github-sync',
+        })
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+        self.cache = caches[GITHUB_CACHE_ALIAS]
+        self.sleep = sleep
+        self.blocked_until = 0
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0}
+        # Guards blocked_until and stats when used from worker threads
+        self.lock = threading.Lock()
+
+    def get_json(self, url, params=None, store=None):
+        """GET ``url`` and return its JSON body, reusing the cached copy on 304"""
+        return self.get(url, params, store)[0]
+
+    def get(self, url, params=None, store=None):
+        """
+        Conditional GET returning the JSON body and the parsed ``Link`` header.
+
+        Validators and bodies live in ``store`` (anything with ``get`` and
+        ``set``), which defaults to the shared cache.
+        """
+        store = self.cache if store is None else store
+        url = url if url.startswith('http') else f'{self.api_url}{url}'
+        prepared = requests.Request('GET', url, params=params).prepare()
+        cache_key = 'github:' + hashlib.md5(prepared.url.encode('utf-8')).hexdigest()
+        cached = store.get(cache_key)
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.request(prepared.url, headers)
+        if response.status_code == 304 and cached:
+            self.count('not_modified')
+            return cached['body'], cached['links']
+        response.raise_for_status()
+
+        body = response.json()
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            store.set(cache_key, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body': body,
+                'links': response.links,
+            }, CONDITIONAL_CACHE_TIMEOUT)
+        return body, response.links
+
+    def paginate(self, url, params=None):
+        """Yield every item of a list endpoint, following ``Link`` headers"""
+        params = {'per_page': 100, **(params or {})}
+        while url:
+            items, links = self.get(url, params)
+            yield from items
+            # The next link already carries the query string
+            url = links.get('next', {}).get('url')
+            params = None
+
+    def request(self, url, headers):
+        """Send a GET, waiting out rate limits and retrying transient errors"""
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            self.wait(self.blocked_until - time.time())
+            response = self.session.get(url, headers=headers, timeout=30)
+            self.count('requests')
+
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                # Don't spend the next request just to be told to wait
+                with self.lock:
+                    self.blocked_until = float(response.headers.get('X-RateLimit-Reset', 0)) + 1
+
+            delay = self.retry_delay(response, attempt)
+            if delay is None or attempt == GITHUB_MAX_RETRIES:
+                return response
+            self.count('retries')
+            self.wait(delay)
+        return response
+
+    def retry_delay(self, response, attempt):
+        """Seconds to wait before retrying ``response``, or None if it is final"""
+        status = response.status_code
+        if status in (403, 429):
+            if 'Retry-After' in response.headers:
+                return float(response.headers['Retry-After'])
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                return max(0, self.blocked_until - time.time())
+            if status == 429 or 'rate limit' in response.text.lower():
+                # Secondary rate limit without hints: at least a minute
+                return 60 * 2 ** attempt
+            return None
+        if status >= 500:
+            return 2 ** attempt
+        return None
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def wait(self, seconds):
+        if seconds <= 0:
+            return
+        if seconds > GITHUB_MAX_WAIT:
+            raise RateLimitExceeded(f'GitHub asked us to wait {int(seconds)}s, more than GITHUB_MAX_WAIT')
+        self.sleep(seconds)
+
+
+def repository_details(client, full_name, store=None):
+    """Languages (largest first), topics and README text of one repository"""
+    languages = client.get_json(f'/repos/{full_name}/languages', store=store)
+    topics = client.get_json(f'/repos/{full_name}/topics', store=store).get('names', [])
+    try:
+        readme = client.get_json(f'/repos/{full_name}/readme', store=store)
+    except requests.exceptions.HTTPError as e:
+        if e.response is None or e.response.status_code != 404:
+            raise
+        readme = None
+    text = ''
+    if readme and readme.get('encoding') == 'base64':
+        try:
+            text = base64.b64decode(readme['content']).decode('utf-8', 'replace')
+        except (binascii.Error, ValueError):
+            pass
+    return {
+        'languages': sorted(languages, key=languages.get, reverse=True),
+        'topics': topics,
+        'readme': text,
+    }
+
+
+def fetch_repository_details(client, full_names, workers=GITHUB_WORKERS, stores=None):
+    """
+    Fetch ``repository_details`` for many repositories concurrently.
+
+    ``stores`` optionally maps a repository name to its own validator store.
+    """
+    full_names = list(full_names)
+    stores = stores or {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda name: repository_details(client, name, stores.get(name)), full_names)
+        return dict(zip(full_names, results))
+
+
+def readme_summary(text, limit=500):
+    """The first prose paragraph of a README, skipping headings, badges and code"""
+    for block in re.split(r'\n\s*\n', text):
+        block = ' '.join(block.split())
+        if block and not block.startswith(('#', '<', '!', '[!', '`', '|', '-', '*', '>', '=')):
+            return block if len(block) <= limit else block[:limit].rsplit(' ', 1)[0] + '…'
+    return ''
@@ -0,0 +1,273 @@
+"""Mirror GitHub repositories into Project rows, skipping the ones that have not changed."""
+import hashlib
+import json
+import re
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_version
+from .github import GITHUB_WORKERS, DictStore, fetch_repository_details, readme_summary
+from .models import GitHubRepository, Project, Skill
+from .project_types import determine_project_type
+from .related import refresh_related_projects
+from .search import update_search_index
+
+# Repositories that are never shown as projects, e.g. this portfolio itself
+EXCLUDED_REPOSITORIES = ['bikalpokharel', 'PORTFOLIO']
+
+# Project fields owned by the sync; others (featured, order, demo URL) are left to the admin
+SYNCED_FIELDS = ['title', 'slug', 'description', 'detailed_description', 'project_type', 'status', 'github_url']
+
+
+def is_relevant(repo):
+    """Skip forks, archived and private repositories"""
+    return (
+        not repo['fork']
+        and not repo['archived']
+        and not repo['private']
+        and repo['name'] not in EXCLUDED_REPOSITORIES
+    )
+
+
+def repository_slug(repo_name):
+    return repo_name.lower().replace('_', '-').replace(' ', '-')
+
+
+def format_title(repo_name):
+    """Format repository name into a proper title"""
+    # Replace underscores and hyphens with spaces
+    title = repo_name.replace('_', ' ').replace('-', ' ')
+    # Capitalize each word
+    return ' '.join(word.capitalize() for word in title.split())
+
+
+def create_detailed_description(repo, details):
+    """Create a detailed description for the project"""
+    language = repo['language'] or 'Various'
+    technologies = ', '.join(details['languages'] + details['topics']) or language
+    about = repo['description'] or 'A software development project showcasing various programming concepts and best practices.'
+    summary = readme_summary(details['readme'])
+    if summary:
+        about = f'{about}\n\n{summary}'
+    stars = repo['stargazers_count']
+    forks = repo['forks_count']
+    created = datetime.strptime(repo['created_at'], '%Y-%m-%dT%H:%M:%SZ').strftime('%B %Y')
+    updated = datetime.strptime(repo['updated_at'], '%Y-%m-%dT%H:%M:%SZ').strftime('%B %Y')
+
+    return f'''A {language} project created in {created} and last updated in {updated}.
+
+Repository Statistics:
+• ⭐ {stars} stars
+• 🍴 {forks} forks
+• 📅 Created: {created}
+• 🔄 Last updated: {updated}
+
+Technologies: {technologies}
+
+{about}
+
+Visit the GitHub repository for more details, documentation, and source code.'''
+
+
+def build_project_data(repo, details):
+    """Project field values derived from a GitHub repository"""
+    description = repo['description'] or f'A {repo["language"] or "software"} project'
+    return {
+        'title': format_title(repo['name']),
+        'slug': repository_slug(repo['name']),
+        'description': description,
+        'detailed_description': create_detailed_description(repo, details),
+        'project_type': determine_project_type(description, details['topics'], repo['language']),
+        'status': 'completed',
+        'github_url': repo['html_url'],
+    }
+
+
+def skill_key(name):
+    """Normalise a skill, language or topic name, e.g. 'Node.js' and 'nodejs'"""
+    return re.sub(r'[^a-z0-9+#]', '', name.lower())
+
+
+def content_hash(data, technology_ids):
+    payload = json.dumps([data, sorted(technology_ids)], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SyncResult:
+    def __init__(self):
+        self.created = []
+        self.updated = []      # (title, changed fields)
+        self.renamed = []      # (old full name, new full name)
+        self.unchanged = 0
+        self.skipped = 0       # untouched upstream since the last sync
+        self.detached = []     # projects deleted in the admin are not recreated
+        self.conflicts = []    # slug already taken by another repository's project
+
+    @property
+    def changed(self):
+        return bool(self.created or self.updated)
+
+
+class RepositorySync:
+    """Apply a list of repositories from the GitHub API to the projects"""
+
+    def __init__(self, client, workers=GITHUB_WORKERS, force=False):
+        self.client = client
+        self.workers = workers
+        self.force = force
+
+    def run(self, repos):
+        repos = [repo for repo in repos if is_relevant(repo)]
+        result = SyncResult()
+        states = {state.repo_id: state for state in GitHubRepository.objects.all()}
+        touched = [repo for repo in repos if self.force or self.is_touched(repo, states.get(repo['id']))]
+        result.skipped = len(repos) - len(touched)
+        if not touched:
+            return result
+
+        stores = {
+            repo['full_name']: DictStore(states[repo['id']].etags if repo['id'] in states else {})
+            for repo in touched
+        }
+        details = fetch_repository_details(
+            self.client, [repo['full_name'] for repo in touched], self.workers, stores
+        )
+        with transaction.atomic():
+            self.apply(touched, details, stores, states, result)
+        return result
+
+    def is_touched(self, repo, state):
+        """Whether a repository changed upstream since it was last synced"""
+        return (
+            state is None
+            or not state.content_hash
+            or state.full_name != repo['full_name']
+            or state.pushed_at != parse_datetime(repo['pushed_at'] or '')
+            or state.repo_updated_at != parse_datetime(repo['updated_at'] or '')
+        )
+
+    def apply(self, repos, details, stores, states, result):
+        skills = {skill_key(name): pk for pk, name in Skill.objects.values_list('id', 'name')}
+        incoming = {repo['id']: build_project_data(repo, details[repo['full_name']]) for repo in repos}
+
+        linked_ids = {state.project_id for state in states.values() if state.project_id}
+        linked = Project.objects.in_bulk([
+            states[repo['id']].project_id for repo in repos
+            if repo['id'] in states and states[repo['id']].project_id
+        ])
+        by_slug = Project.objects.in_bulk([data['slug'] for data in incoming.values()], field_name='slug')
+
+        creates, updates, tags, state_rows = [], [], {}, []
+        for repo in repos:
+            repo_details = details[repo['full_name']]
+            data = incoming[repo['id']]
+            technologies = {
+                skills[skill_key(name)]
+                for name in repo_details['languages'] + repo_details['topics']
+                if skill_key(name) in skills
+            }
+            digest = content_hash(data, technologies)
+            state = states.get(repo['id'])
+            project = None
+
+            if state is not None:
+                project = linked.get(state.project_id)
+                if project is None:
+                    result.detached.append(repo['full_name'])
+                elif state.full_name != repo['full_name']:
+                    result.renamed.append((state.full_name, repo['full_name']))
+                write = digest != state.content_hash or self.force
+            else:
+                project = by_slug.get(data['slug'])
+                if project is not None and project.pk in linked_ids:
+                    result.conflicts.append(repo['full_name'])
+                    continue
+                # Existing projects are adopted as they are unless forced
+                write = self.force
+
+            if project is None and state is None:
+                if data['slug'] in by_slug:
+                    result.conflicts.append(repo['full_name'])
+                    continue
+                project = Project(**data, demo_url='', is_featured=True, order=0)
+                creates.append(project)
+                by_slug[data['slug']] = project
+                tags[data['slug']] = technologies
+                result.created.append(data['title'])
+            elif project is not None and write:
+                # Keep the old slug if a rename would collide with another project
+                if by_slug.get(data['slug'], project) is not project:
+                    data['slug'] = project.slug
+                by_slug[data['slug']] = project
+                fields = [field for field in SYNCED_FIELDS if getattr(project, field) != data[field]]
+                if fields:
+                    for field in fields:
+                        setattr(project, field, data[field])
+                    updates.append(project)
+                    result.updated.append((data['title'], fields))
+                else:
+                    result.unchanged += 1
+                tags[project.slug] = technologies
+            elif project is not None:
+                result.unchanged += 1
+
+            state_rows.append((repo, project, digest))
+
+        now = timezone.now()
+        if creates:
+            Project.objects.bulk_create(creates)
+        if updates:
+            for project in updates:
+                project.updated_at = now
+            Project.objects.bulk_update(updates, [*SYNCED_FIELDS, 'updated_at'])
+
+        ids = dict(Project.objects.filter(slug__in=tags).values_list('slug', 'id'))
+        tagged = self.add_technologies({ids[slug]: tech for slug, tech in tags.items() if slug in ids})
+
+        GitHubRepository.objects.bulk_create(
+            [
+                GitHubRepository(
+                    repo_id=repo['id'],
+                    full_name=repo['full_name'],
+                    project_id=(project.pk or ids.get(project.slug)) if project is not None else None,
+                    pushed_at=parse_datetime(repo['pushed_at'] or ''),
+                    repo_updated_at=parse_datetime(repo['updated_at'] or ''),
+                    etags=dict(stores[repo['full_name']]),
+                    content_hash=digest,
+                )
+                for repo, project, digest in state_rows
+            ],
+            update_conflicts=True,
+            unique_fields=['repo_id'],
+            update_fields=['full_name', 'project', 'pushed_at', 'repo_updated_at', 'etags', 'content_hash', 'synced_at'],
+        )
+
+        # Bulk queries bypass the signals that maintain these
+        refresh = {ids[project.slug] for project in creates} | {project.pk for project in updates} | tagged
+        if refresh:
+            update_search_index(refresh)
+            refresh_related_projects(refresh)
+            transaction.on_commit(lambda: bump_version('pages'))
+
+    def add_technologies(self, technologies):
+        """Link matched skills to projects by id, returning the ids that gained any"""
+        Through = Project.technologies.through
+        existing = set(
+            Through.objects.filter(project_id__in=technologies).values_list('project_id', 'skill_id')
+        )
+        new_links = [
+            Through(project_id=project_id, skill_id=skill_id)
+            for project_id, skill_ids in technologies.items()
+            for skill_id in skill_ids
+            if (project_id, skill_id) not in existing
+        ]
+        if not new_links:
+            return set()
+        Through.objects.bulk_create(new_links, ignore_conflicts=True)
+        tagged = {link.project_id for link in new_links}
+        # Cached project cards are keyed on updated_at
+        Project.objects.filter(id__in=tagged).update(updated_at=timezone.now())
+        return tagged
@@ -0,0 +1,152 @@
+"""Responsive image derivatives, rebuilt in the background when an image changes."""
+import base64
+import hashlib
+import io
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_version
+from .jobs import enqueue, task
+from .models import SiteConfiguration
+
+DERIVATIVE_WIDTHS = getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 960, 1280))
+DERIVATIVE_QUALITY = getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+DERIVATIVE_DIR = 'derivatives'
+# Bump when records gain new data so existing images are reprocessed
+DERIVATIVES_VERSION = 2
+
+# Longest side of the inline low-quality placeholder
+PLACEHOLDER_SIZE = 16
+
+# Preferred first: browsers take the first <source> type they support
+DERIVATIVE_FORMATS = (('avif', 'AVIF', 'image/avif'), ('webp', 'WEBP', 'image/webp'))
+
+
+def available_formats():
+    """Derivative formats this Pillow build can encode"""
+    Image.init()
+    return [fmt for fmt in DERIVATIVE_FORMATS if fmt[1] in Image.SAVE]
+
+
+def file_digest(field_file):
+    """SHA-256 of a file field's content, read in chunks"""
+    h = hashlib.sha256()
+    with field_file.storage.open(field_file.name, 'rb') as f:
+        for chunk in f.chunks():
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def target_widths(width):
+    """Widths to render for an image ``width`` pixels wide, never upscaling"""
+    widths = [w for w in DERIVATIVE_WIDTHS if w < width]
+    if width <= max(DERIVATIVE_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def build_placeholder(img):
+    """A tiny base64 data URI of ``img``, blurred by the browser while the real image loads"""
+    thumb = img.copy()
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    Image.init()
+    fmt, mime = ('WEBP', 'image/webp') if 'WEBP' in Image.SAVE else ('PNG', 'image/png')
+    buffer = io.BytesIO()
+    thumb.save(buffer, fmt, quality=50)
+    return f'data:{mime};base64,{base64.b64encode(buffer.getvalue()).decode("ascii")}'
+
+
+def build_derivatives(field_file, digest):
+    """Write resized copies of ``field_file`` and describe them"""
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as f, Image.open(f) as source:
+        img = ImageOps.exif_transpose(source)
+        img.load()
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+    variants = []
+    for width in target_widths(img.width):
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        for ext, pil_format, mime in available_formats():
+            name = f'{DERIVATIVE_DIR}/{digest[:24]}-{width}w.{ext}'
+            if not storage.exists(name):
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, quality=DERIVATIVE_QUALITY)
+                storage.save(name, ContentFile(buffer.getvalue()))
+            variants.append({'name': name, 'width': width, 'type': mime})
+    return {
+        'version': DERIVATIVES_VERSION,
+        'width': img.width,
+        'height': img.height,
+        'placeholder': build_placeholder(img),
+        'variants': variants,
+    }
+
+
+def derivatives_current(instance, field_name):
+    """Whether ``<field_name>_derivatives`` describes the current file"""
+    field_file = getattr(instance, field_name)
+    record = getattr(instance, f'{field_name}_derivatives') or {}
+    if not field_file:
+        return not record
+    return record.get('source') == field_file.name and record.get('version') == DERIVATIVES_VERSION
+
+
+def schedule_derivatives(instance, field_name):
+    """Queue a derivative rebuild if the image was replaced or removed"""
+    if not derivatives_current(instance, field_name):
+        opts = instance._meta
+        enqueue(
+            'images.build_derivatives',
+            key=f'images:{opts.label_lower}:{instance.pk}:{field_name}',
+            model=opts.label_lower, pk=instance.pk, field_name=field_name,
+        )
+
+
+@task('images.build_derivatives')
+def build_image_derivatives(model, pk, field_name):
+    """
+    Bring ``<field_name>_derivatives`` of one object up to date.
+
+    Pillow only runs when the file content hash changed. The record is written
+    with ``update()`` so no save signals fire, and only if the object still
+    has the same file; a newer upload will have queued its own job.
+    """
+    model = apps.get_model(model)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or derivatives_current(instance, field_name):
+        return
+
+    record_name = f'{field_name}_derivatives'
+    field_file = getattr(instance, field_name)
+    record = getattr(instance, record_name) or {}
+    if not field_file:
+        new_record = {}
+    else:
+        digest = file_digest(field_file)
+        if digest == record.get('hash') and record.get('version') == DERIVATIVES_VERSION:
+            new_record = dict(record, source=field_file.name)
+        else:
+            new_record = dict(build_derivatives(field_file, digest), hash=digest, source=field_file.name)
+
+    changes = {record_name: new_record}
+    # Cached project cards are keyed on updated_at
+    changes.update({
+        f.name: timezone.now() for f in model._meta.fields if getattr(f, 'auto_now', False)
+    })
+    if field_file:
+        same_file = Q(**{field_name: field_file.name})
+    else:
+        same_file = Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})
+    if model.objects.filter(same_file, pk=pk).update(**changes):
+        if model is SiteConfiguration:
+            bump_version('pages', 'site_config')
+        else:
+            bump_version('pages')
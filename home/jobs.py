@@ -0,0 +1,125 @@
+"""A small job queue stored in the database and run by ``manage.py run_worker``."""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Min, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+JOB_RETRY_DELAY = getattr(settings, 'JOB_RETRY_DELAY', 60)
+JOB_TIMEOUT = getattr(settings, 'JOB_TIMEOUT', 10 * 60)
+JOB_RETENTION = getattr(settings, 'JOB_RETENTION', 7 * 24 * 60 * 60)
+
+# Registered task functions by name
+TASKS = {}
+
+
+def task(name):
+    """Register a function so workers can run it by ``name``"""
+    def decorator(func):
+        TASKS[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def enqueue(name, key='', delay=0, **payload):
+    """
+    Queue ``name`` to run with ``payload`` once the current transaction commits.
+
+    The job becomes due ``delay`` seconds from now. If a job with the same
+    non-empty ``key`` is still waiting, its payload is replaced instead of
+    adding another job, and it keeps the earlier of the two due times.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task '{name}'")
+
+    def create():
+        run_after = timezone.now() + timedelta(seconds=delay)
+        if key and Job.objects.filter(key=key, status='queued').update(
+            payload=payload, run_after=Least('run_after', Value(run_after))
+        ):
+            return
+        Job.objects.create(task=name, key=key, payload=payload, run_after=run_after)
+
+    transaction.on_commit(create)
+
+
+def claim_next_job():
+    """Mark the oldest due job as running and return it, or None"""
+    now = timezone.now()
+    while True:
+        job = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        # Only one worker wins the status change; losers try the next job
+        claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+            status='running', started_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job):
+    """Execute a claimed job and record the outcome"""
+    func = TASKS.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task '{job.task}'")
+        func(**job.payload)
+    except Exception:
+        logger.exception(f'Job {job} failed')
+        job.last_error = traceback.format_exc()
+        job.finished_at = timezone.now()
+        if job.attempts < JOB_MAX_ATTEMPTS and func is not None:
+            job.status = 'queued'
+            job.run_after = job.finished_at + timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = 'failed'
+        job.save(update_fields=['status', 'last_error', 'finished_at', 'run_after'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+    return True
+
+
+def requeue_stalled_jobs():
+    """Return jobs abandoned by a crashed worker to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=JOB_TIMEOUT)
+    return Job.objects.filter(status='running', started_at__lt=cutoff).update(status='queued')
+
+
+def purge_finished_jobs():
+    """Delete successful jobs older than ``JOB_RETENTION``"""
+    cutoff = timezone.now() - timedelta(seconds=JOB_RETENTION)
+    return Job.objects.filter(status='done', finished_at__lt=cutoff).delete()[0]
+
+
+def queue_stats():
+    """Depth and latency figures for the admin"""
+    now = timezone.now()
+    counts = dict.fromkeys(dict(Job.STATUSES), 0)
+    for row in Job.objects.values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+    oldest = Job.objects.filter(status='queued', run_after__lte=now).aggregate(oldest=Min('created_at'))['oldest']
+    recent = Job.objects.filter(status='done', finished_at__gte=now - timedelta(hours=24)).aggregate(
+        wait=Avg(F('started_at') - F('created_at')),
+        run=Avg(F('finished_at') - F('started_at')),
+    )
+    return {
+        'counts': counts,
+        'oldest_wait': now - oldest if oldest else None,
+        'average_wait': recent['wait'],
+        'average_run': recent['run'],
+    }
@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand
+from home.project_types import DEFAULT_PROJECT_TYPE_KEYWORDS, classifier
+import random
+import re
+import time
+
+# Words that used to trip the substring matcher: 'happy' contains 'app', 'detail' contains 'ai'
+FALSE_POSITIVE_WORDS = ['happy', 'detail', 'email', 'training', 'mapping', 'wrapper']
+FILLER_WORDS = [
+    'a', 'simple', 'tool', 'for', 'managing', 'my', 'personal', 'happy', 'detail', 'email', 'training',
+    'mapping', 'wrapper', 'client', 'server', 'library', 'with', 'and', 'the', 'project', 'using',
+    'fast', 'small', 'experiment', 'html5', 'cli', 'api', 'homework', 'assignment', 'game',
+]
+
+
+def legacy_project_type(language, description):
+    """The substring matcher this classifier replaced, kept for comparison"""
+    description_lower = description.lower()
+
+    if any(word in description_lower for word in ['web', 'website', 'app', 'django', 'flask', 'react', 'vue', 'angular']):
+        return 'web_app'
+    elif any(word in description_lower for word in ['ml', 'machine learning', 'ai', 'artificial intelligence', 'data science', 'tensorflow', 'pytorch']):
+        return 'ml_project'
+    elif any(word in description_lower for word in ['mobile', 'android', 'ios', 'react native', 'flutter']):
+        return 'mobile_app'
+    elif any(word in description_lower for word in ['ai', 'artificial intelligence', 'chatbot', 'nlp']):
+        return 'ai_project'
+    elif any(word in description_lower for word in ['data', 'analysis', 'visualization', 'pandas', 'numpy']):
+        return 'data_science'
+    else:
+        return 'other'
+
+
+def per_keyword_project_type(patterns, description):
+    """One word-boundary search per keyword, type by type: slow, but obviously right"""
+    for project_type, keyword_patterns in patterns:
+        if any(pattern.search(description) for pattern in keyword_patterns):
+            return project_type
+    return 'other'
+
+
+class Command(BaseCommand):
+    help = 'Time the project type classifier against the substring matcher it replaced'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=100_000,
+            help='Number of synthetic descriptions to classify'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the generated descriptions'
+        )
+    
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        keywords = [word for _, words in DEFAULT_PROJECT_TYPE_KEYWORDS for word in words]
+        plain_words = [word for word in FILLER_WORDS if word not in FALSE_POSITIVE_WORDS]
+        
+        def generate(filler):
+            descriptions = []
+            for _ in range(options['count']):
+                words = rng.choices(filler, k=rng.randint(5, 20))
+                # Most real descriptions mention a technology or two, some none at all
+                for _ in range(rng.choice([0, 1, 1, 2])):
+                    words.insert(rng.randrange(len(words) + 1), rng.choice(keywords).title())
+                descriptions.append(' '.join(words))
+            return descriptions
+        
+        per_keyword = [
+            (project_type, [re.compile(rf'(?<!\w){re.escape(word)}(?!\w)', re.IGNORECASE) for word in words])
+            for project_type, words in DEFAULT_PROJECT_TYPE_KEYWORDS
+        ]
+        
+        for label, descriptions in [
+            ('Descriptions with words like "happy" and "mapping"', generate(FILLER_WORDS)),
+            ('Descriptions without them', generate(plain_words)),
+        ]:
+            self.stdout.write(label)
+            timings = []
+            for func in [lambda description: legacy_project_type(None, description), classifier.classify]:
+                start = time.perf_counter()
+                results = [func(description) for description in descriptions]
+                timings.append((time.perf_counter() - start, results))
+            (legacy_time, old), (classifier_time, new) = timings
+            for name, elapsed in [('Substring matcher (old)', legacy_time), ('Classifier', classifier_time)]:
+                self.stdout.write(
+                    f'  {name:<24} {elapsed:.3f}s ({elapsed * 1e6 / len(descriptions):.2f} µs per description)'
+                )
+            
+            expected = [per_keyword_project_type(per_keyword, description) for description in descriptions]
+            mismatches = sum(a != b for a, b in zip(expected, new))
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f'  {mismatches} results differ from one regex per keyword'))
+            changed = sum(a != b for a, b in zip(old, new))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'  Classifier is {legacy_time / classifier_time:.2f}x the speed of the old substring matcher; '
+                    f'{changed} of {len(descriptions)} descriptions are classified differently'
+                )
+            )
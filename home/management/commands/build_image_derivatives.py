@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from home.images import build_image_derivatives, derivatives_current
+from home.models import Project, SiteConfiguration, Testimonial
+
+IMAGE_FIELDS = [
+    (Project, 'image'),
+    (Testimonial, 'image'),
+    (SiteConfiguration, 'profile_image'),
+]
+
+class Command(BaseCommand):
+    help = 'Build missing responsive WebP/AVIF copies of project, testimonial and profile images now'
+    
+    def handle(self, *args, **options):
+        built = 0
+        for model, field_name in IMAGE_FIELDS:
+            for obj in model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}):
+                if not derivatives_current(obj, field_name):
+                    build_image_derivatives(model._meta.label_lower, obj.pk, field_name)
+                    built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated image derivatives for {built} objects')
+        )
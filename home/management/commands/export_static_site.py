@@ -0,0 +1,192 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from home.models import Project, RelatedProject, SiteConfiguration, Skill
+from home.views import PROJECTS_PER_PAGE
+from html import unescape
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urljoin
+import hashlib
+import json
+import math
+import re
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def digest(rows):
+    """Hash an iterable of rows into a short, stable fingerprint"""
+    h = hashlib.sha256()
+    for row in rows:
+        h.update(repr(tuple(row)).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()[:16]
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the public pages to static HTML, re-rendering only pages whose content changed. '
+        'Every page of the projects listing, filtered by each project type, is exported too; '
+        'search needs the live site.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(getattr(settings, 'STATIC_EXPORT_ROOT', settings.BASE_DIR / 'static_site')),
+            help='Directory to write the rendered site to'
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            default=getattr(settings, 'STATIC_EXPORT_HOST', 'localhost'),
+            help='Host name to render the pages for (must be in ALLOWED_HOSTS)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every page even if its dependencies are unchanged'
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        force = options['force']
+        output.mkdir(parents=True, exist_ok=True)
+
+        manifest_path = output / MANIFEST_NAME
+        manifest = {}
+        if manifest_path.exists() and not force:
+            manifest = json.loads(manifest_path.read_text())
+
+        pages = self.collect_pages()
+        client = Client(HTTP_HOST=options['host'])
+        rendered = written = 0
+        new_manifest = {}
+
+        for url, deps in pages.items():
+            entry = manifest.get(url)
+            target = output / self.file_for(url)
+            if entry and entry['deps'] == deps and target.exists():
+                new_manifest[url] = entry
+                continue
+
+            response = client.get(url, secure=True)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned HTTP {response.status_code}')
+            rendered += 1
+            content = response.content
+            if target.suffix == '.html':
+                content = self.static_links(content.decode(response.charset), url).encode(response.charset)
+
+            content_hash = hashlib.sha256(content).hexdigest()
+            if not (entry and entry['hash'] == content_hash and target.exists()):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+                written += 1
+            new_manifest[url] = {'file': self.file_for(url), 'hash': content_hash, 'deps': deps}
+
+        # Drop pages that no longer exist, e.g. deleted projects
+        removed = 0
+        kept = {entry['file'] for entry in new_manifest.values()}
+        for url, entry in manifest.items():
+            if url not in new_manifest and entry['file'] not in kept:
+                stale = output / entry['file']
+                if stale.exists():
+                    stale.unlink()
+                removed += 1
+
+        manifest_path.write_text(json.dumps(new_manifest, indent=2, sort_keys=True))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Exported {len(pages)} pages to {output}: '
+                f'{rendered} rendered, {written} written, {removed} removed'
+            )
+        )
+
+    def collect_pages(self):
+        """Map every public URL to the fingerprints of the data it renders"""
+        config = digest(SiteConfiguration.objects.values_list())
+        skills = digest(Skill.objects.values_list())
+        technologies = digest(
+            Project.technologies.through.objects.order_by('project_id', 'skill_id').values_list('project_id', 'skill_id')
+        )
+        projects = digest(Project.objects.order_by('id').values_list('id', 'updated_at'))
+        featured = digest(Project.objects.filter(is_featured=True).values_list('id', 'updated_at'))
+
+        pages = {
+            reverse('home'): {'config': config, 'skills': skills, 'projects': featured, 'technologies': technologies},
+            reverse('about'): {'config': config, 'skills': skills},
+            reverse('django.contrib.sitemaps.views.sitemap'): {'projects': projects},
+        }
+
+        # Every numbered page of the listing, unfiltered and for each type; ?page= keeps
+        # the view off cursor links, which a file server cannot follow
+        listing = {'config': config, 'skills': skills, 'projects': projects, 'technologies': technologies}
+        counts = dict(Project.objects.order_by().values_list('project_type').annotate(count=Count('id')))
+        for project_type in [None, *dict(Project.PROJECT_TYPES)]:
+            count = counts.get(project_type, 0) if project_type else sum(counts.values())
+            for page in range(1, max(1, math.ceil(count / PROJECTS_PER_PAGE)) + 1):
+                query = urlencode({'type': project_type, 'page': page} if project_type else {'page': page})
+                pages[f"{reverse('projects')}?{query}"] = listing
+
+        # Each detail page depends on its own row and on the related cards
+        related = {}
+        for project_id, related_id, updated_at in RelatedProject.objects.values_list(
+            'project_id', 'related_id', 'related__updated_at'
+        ):
+            related.setdefault(project_id, []).append((related_id, updated_at))
+        tech_by_project = {}
+        for project_id, skill_id in Project.technologies.through.objects.values_list('project_id', 'skill_id'):
+            tech_by_project.setdefault(project_id, []).append(skill_id)
+
+        for project in Project.objects.only('id', 'slug', 'updated_at'):
+            pages[project.get_absolute_url()] = {
+                'config': config,
+                'skills': skills,
+                'project': digest([
+                    (project.updated_at,),
+                    sorted(tech_by_project.get(project.id, [])),
+                    related.get(project.id, []),
+                ]),
+            }
+        return pages
+
+    def file_for(self, url):
+        """Map a URL path onto a file a plain web server can serve"""
+        url, _, query = url.partition('?')
+        if query:
+            params = parse_qs(query)
+            return self.listing_file(params.get('type', [None])[0], int(params.get('page', ['1'])[0]))
+        path = url.strip('/')
+        if path.endswith('.xml'):
+            return path
+        return f'{path}/index.html' if path else 'index.html'
+
+    def listing_file(self, project_type=None, page=1):
+        """File for one page of the projects listing, e.g. projects/type-web-page-2.html"""
+        base = reverse('projects').strip('/')
+        name = '-'.join(
+            ([f'type-{project_type}'] if project_type else []) + ([f'page-{page}'] if page > 1 else [])
+        )
+        # Slugs cannot contain a dot, so these never clash with a project's directory
+        return f'{base}/{name}.html' if name else f'{base}/index.html'
+
+    def static_links(self, html, page_url):
+        """Point links to filtered or numbered listing pages at their exported files"""
+        listing = reverse('projects')
+
+        def replace(match):
+            path, _, query = urljoin(page_url, unescape(match.group(1))).partition('?')
+            params = parse_qs(query)
+            if path != listing or not params or set(params) - {'type', 'page'}:
+                return match.group(0)
+            try:
+                page = int(params.get('page', ['1'])[0])
+            except ValueError:
+                return match.group(0)
+            return f'href="/{self.listing_file(params.get("type", [None])[0], page)}"'
+
+        return re.sub(r'href="([^"]*)"', replace, html)
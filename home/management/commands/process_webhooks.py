@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from home.models import WebhookDelivery
+from home.webhooks import process_delivery, process_pushes, requeue_stalled_deliveries
+
+class Command(BaseCommand):
+    help = 'Apply stored GitHub webhook deliveries that are still pending, without waiting for the worker'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry deliveries that ran out of attempts'
+        )
+    
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = WebhookDelivery.objects.filter(status='failed').update(status='pending', attempts=0)
+            self.stdout.write(f'Retrying {retried} failed deliveries')
+        stalled = requeue_stalled_deliveries()
+        if stalled:
+            self.stdout.write(f'Retrying {stalled} deliveries abandoned by a stopped worker')
+        
+        pending = WebhookDelivery.objects.filter(status='pending').order_by('received_at')
+        processed = merged = failed = 0
+        pushed_repos = set()
+        for delivery_id, event, repo_id in pending.values_list('delivery_id', 'event', 'repo_id'):
+            try:
+                if event == 'push' and repo_id is not None:
+                    # All waiting pushes to a repository collapse into one sync
+                    if repo_id in pushed_repos:
+                        continue
+                    pushed_repos.add(repo_id)
+                    count = process_pushes(repo_id)
+                    if count is not None:
+                        processed += 1
+                        merged += count
+                elif process_delivery(delivery_id):
+                    processed += 1
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'Delivery {delivery_id} failed: {e}'))
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'{processed} deliveries processed, {merged} merged into later pushes, {failed} failed')
+        )
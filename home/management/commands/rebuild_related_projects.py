@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from home.related import rebuild_related_projects
+
+class Command(BaseCommand):
+    help = 'Recompute the related projects shown on every project detail page'
+    
+    def handle(self, *args, **options):
+        count = rebuild_related_projects()
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {count} related project recommendations')
+        )
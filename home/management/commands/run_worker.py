@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from home.jobs import JOB_TIMEOUT, claim_next_job, purge_finished_jobs, requeue_stalled_jobs, run_job
+from home.webhooks import requeue_stalled_deliveries
+import time
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs such as image processing'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'JOB_POLL_INTERVAL', 5),
+            help='Seconds to sleep when the queue is empty'
+        )
+    
+    def handle(self, *args, **options):
+        self.housekeeping()
+        last_housekeeping = time.monotonic()
+        
+        succeeded = failed = 0
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['burst']:
+                        break
+                    if time.monotonic() - last_housekeeping > JOB_TIMEOUT:
+                        self.housekeeping()
+                        last_housekeeping = time.monotonic()
+                    time.sleep(options['poll_interval'])
+                    continue
+                if run_job(job):
+                    succeeded += 1
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'{job} failed (attempt {job.attempts})'))
+        except KeyboardInterrupt:
+            pass
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Worker stopped: {succeeded} jobs done, {failed} failed')
+        )
+    
+    def housekeeping(self):
+        """Requeue jobs and webhook deliveries from crashed workers and drop old finished jobs"""
+        requeued = requeue_stalled_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled jobs'))
+        requeued = requeue_stalled_deliveries()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled webhook deliveries'))
+        purge_finished_jobs()
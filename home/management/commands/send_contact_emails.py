@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from home.models import ContactNotification
+from home.notifications import send_contact_notifications
+
+class Command(BaseCommand):
+    help = 'Send due contact form notifications now, e.g. as a scheduled digest, instead of waiting for the worker'
+    
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--digest',
+            action='store_true',
+            help='Send the due messages batched into digest emails, whatever CONTACT_EMAIL_MODE says'
+        )
+        mode.add_argument(
+            '--per-message',
+            action='store_true',
+            help='Send one email per due message, whatever CONTACT_EMAIL_MODE says'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry notifications that ran out of attempts'
+        )
+    
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = ContactNotification.objects.filter(status='failed').update(status='pending', attempts=0)
+            self.stdout.write(f'Retrying {retried} failed notifications')
+        
+        digest = None  # CONTACT_EMAIL_MODE decides
+        if options['digest']:
+            digest = True
+        elif options['per_message']:
+            digest = False
+        sent, failed = send_contact_notifications(digest)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'{sent} notifications sent, {failed} failed')
+        )
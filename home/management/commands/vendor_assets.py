@@ -0,0 +1,190 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from home.models import Skill
+from pathlib import Path
+import json
+import re
+import requests
+
+FONT_AWESOME_URL = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0'
+GOOGLE_FONTS_URL = (
+    'https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900'
+    '&family=JetBrains+Mono:wght@400;500;600&display=swap'
+)
+
+# Files copied as they are, minus their source map comments
+LIBRARIES = {
+    'css': {
+        'bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css',
+        'aos.css': 'https://unpkg.com/aos@2.3.1/dist/aos.css',
+    },
+    'js': {
+        'bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js',
+        'aos.js': 'https://unpkg.com/aos@2.3.1/dist/aos.js',
+    },
+}
+
+# Google only serves woff2 to user agents it recognises as modern browsers
+BROWSER_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+FONT_SUBSETS = ('latin', 'latin-ext')
+
+# Fonts needed for the first paint: body text, headings and the navbar icons
+PRELOAD_FONTS = ('poppins-400-latin.woff2', 'poppins-700-latin.woff2', 'fa-solid-900.woff2', 'fa-brands-400.woff2')
+
+ICON_RE = re.compile(r'\bfa-[a-z0-9-]+')
+ICON_SELECTOR_RE = re.compile(r'^\.(fa-[a-z0-9-]+)::?before$')
+SOURCE_MAP_RE = re.compile(r'\n?(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$')
+
+
+def split_rules(css):
+    """Split a stylesheet into top-level ``(prelude, body)`` pairs"""
+    rules = []
+    depth = 0
+    start = body_start = 0
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                body_start = index
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:body_start].strip(), css[body_start + 1:index]))
+                start = index + 1
+    return rules
+
+
+def subset_font_awesome(css, used_icons):
+    """Keep every Font Awesome rule except icon glyphs nobody references"""
+    kept = []
+    codepoints = set()
+    for prelude, body in split_rules(css):
+        selectors = prelude.split(',')
+        matches = [ICON_SELECTOR_RE.match(selector.strip()) for selector in selectors]
+        if not body.startswith('content:') or not all(matches):
+            kept.append(f'{prelude}{{{body}}}')
+            continue
+        used = [selector for selector, match in zip(selectors, matches) if match.group(1) in used_icons]
+        if used:
+            kept.append(f'{",".join(used)}{{{body}}}')
+            for code in re.findall(r'\\([0-9a-f]+)', body):
+                codepoints.add(int(code, 16))
+    return ''.join(kept), codepoints
+
+
+class Command(BaseCommand):
+    help = 'Download Bootstrap, AOS, Font Awesome and the Google Fonts into static/vendor, subset to what the site uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(Path(settings.STATICFILES_DIRS[0]) / 'vendor'),
+            help='Directory to write the vendored assets to'
+        )
+
+    def handle(self, *args, **options):
+        self.output = Path(options['output'])
+        (self.output / 'webfonts').mkdir(parents=True, exist_ok=True)
+        self.session = requests.Session()
+
+        manifest = {'css': [], 'js': [], 'preload': []}
+        try:
+            for kind, files in LIBRARIES.items():
+                for name, url in files.items():
+                    content = SOURCE_MAP_RE.sub('', self.fetch(url).text)
+                    (self.output / name).write_text(content, encoding='utf-8')
+                    manifest[kind].append(f'vendor/{name}')
+
+            manifest['css'].insert(0, self.vendor_fonts())
+            manifest['css'].insert(1, self.vendor_font_awesome())
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f'Error downloading assets: {e}')
+
+        for name in PRELOAD_FONTS:
+            if (self.output / 'webfonts' / name).exists():
+                manifest['preload'].append(f'vendor/webfonts/{name}')
+
+        (self.output / 'manifest.json').write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        self.stdout.write(
+            self.style.SUCCESS(f'Vendored front-end assets into {self.output}; run collectstatic to publish them')
+        )
+
+    def fetch(self, url, **kwargs):
+        response = self.session.get(url, timeout=30, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def vendor_fonts(self):
+        """Self-host Poppins and JetBrains Mono, keeping only Latin subsets"""
+        css = self.fetch(GOOGLE_FONTS_URL, headers={'User-Agent': BROWSER_USER_AGENT}).text
+        blocks = re.findall(r'/\* ([\w-]+) \*/\s*(@font-face\s*\{[^}]*\})', css)
+        files = {}
+        kept = []
+        for subset, block in blocks:
+            if subset not in FONT_SUBSETS:
+                continue
+            family = re.search(r"font-family:\s*'([^']+)'", block).group(1)
+            weight = re.search(r'font-weight:\s*(\d+)', block).group(1)
+            url = re.search(r'url\((https://[^)]+)\)', block).group(1)
+            if url not in files:
+                files[url] = f'{family.lower().replace(" ", "-")}-{weight}-{subset}.woff2'
+                (self.output / 'webfonts' / files[url]).write_bytes(self.fetch(url).content)
+            kept.append(block.replace(url, f'webfonts/{files[url]}'))
+        (self.output / 'fonts.css').write_text('\n'.join(kept), encoding='utf-8')
+        self.stdout.write(f'Fonts: kept {len(kept)} of {len(blocks)} @font-face rules')
+        return 'vendor/fonts.css'
+
+    def vendor_font_awesome(self):
+        """Self-host Font Awesome with only the icons the site references"""
+        css = self.fetch(f'{FONT_AWESOME_URL}/css/all.min.css').text
+        css = SOURCE_MAP_RE.sub('', css)
+        # Every browser we support reads woff2; drop the TrueType fallbacks
+        css = re.sub(r',\s*url\([^)]*\.ttf\)\s*format\("truetype"\)', '', css)
+        css = css.replace('../webfonts/', 'webfonts/')
+
+        used_icons = self.used_icons()
+        css, codepoints = subset_font_awesome(css, used_icons)
+
+        for name in sorted(set(re.findall(r'webfonts/([\w-]+\.woff2)', css))):
+            target = self.output / 'webfonts' / name
+            target.write_bytes(self.fetch(f'{FONT_AWESOME_URL}/webfonts/{name}').content)
+            self.subset_glyphs(target, codepoints)
+
+        (self.output / 'fontawesome.min.css').write_text(css, encoding='utf-8')
+        self.stdout.write(f'Font Awesome: kept {len(used_icons)} icon classes')
+        return 'vendor/fontawesome.min.css'
+
+    def used_icons(self):
+        """Collect icon classes from templates, scripts and Skill.icon values"""
+        base_dir = Path(settings.BASE_DIR)
+        sources = list((base_dir / 'home' / 'templates').rglob('*.html'))
+        sources += [path for path in Path(settings.STATICFILES_DIRS[0]).rglob('*.js') if 'vendor' not in path.parts]
+        icons = set()
+        for path in sources:
+            icons |= set(ICON_RE.findall(path.read_text(encoding='utf-8')))
+        for icon in Skill.objects.exclude(icon='').values_list('icon', flat=True):
+            icons |= set(ICON_RE.findall(icon))
+        icons |= set(getattr(settings, 'VENDOR_EXTRA_ICONS', []))
+        return icons
+
+    def subset_glyphs(self, path, codepoints):
+        """Strip unused glyphs from a webfont when fontTools is installed"""
+        try:
+            from fontTools import subset
+        except ImportError:
+            return
+        options = subset.Options()
+        options.flavor = 'woff2'
+        try:
+            font = subset.load_font(str(path), options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+            subset.save_font(font, str(path), options)
+        except Exception as e:
+            # woff2 output also needs brotli; keep the full font without it
+            self.stdout.write(self.style.WARNING(f'Could not subset {path.name}: {e}'))
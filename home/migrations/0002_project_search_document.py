@@ -0,0 +1,62 @@
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+
+def populate_search_documents(apps, schema_editor):
+    Project = apps.get_model('home', 'Project')
+    for project in Project.objects.prefetch_related('technologies'):
+        technologies = ' '.join(skill.name for skill in project.technologies.all())
+        project.search_document = '\n'.join([project.title, project.description, technologies])
+        project.save(update_fields=['search_document'])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        # Built from the same expression home.search filters on, so the planner can use it
+        index = GinIndex(SearchVector('search_document', config='english'), name='home_project_search_gin')
+        schema_editor.execute(index.create_sql(apps.get_model('home', 'Project'), schema_editor))
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE home_project_fts USING fts5("
+                "title, description, technologies, tokenize='porter unicode61')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5; search falls back to icontains
+            return
+        schema_editor.execute(
+            "INSERT INTO home_project_fts (rowid, title, description, technologies) "
+            "SELECT p.id, p.title, p.description, COALESCE(("
+            "  SELECT group_concat(s.name, ' ') FROM home_project_technologies pt "
+            "  JOIN home_skill s ON s.id = pt.skill_id WHERE pt.project_id = p.id"
+            "), '') FROM home_project p"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS home_project_search_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS home_project_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_project_search_document'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='project',
+            options={'ordering': ['-is_featured', 'order', '-created_at', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-is_featured', 'order', '-created_at', 'id'], name='home_project_listing_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GitHubRepository',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('repo_id', models.BigIntegerField(unique=True)),
+                ('full_name', models.CharField(max_length=200)),
+                ('pushed_at', models.DateTimeField(blank=True, null=True)),
+                ('repo_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('etags', models.JSONField(blank=True, default=dict, editable=False)),
+                ('content_hash', models.CharField(blank=True, max_length=64)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='github_repository', to='home.project')),
+            ],
+            options={
+                'verbose_name': 'GitHub repository',
+                'verbose_name_plural': 'GitHub repositories',
+                'ordering': ['full_name'],
+            },
+        ),
+    ]
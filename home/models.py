@@ -1,7 +1,22 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.urls import reverse
-from PIL import Image
-import os
+from django.utils import timezone
+
+class SkillQuerySet(models.QuerySet):
+    def grouped_by_category(self, categories):
+        """
+        Bucket skills by category using a single query.
+
+        ``categories`` maps category values to the keys of the returned dict,
+        which keeps that order. Skills inside each bucket keep Meta.ordering.
+        """
+        groups = {key: [] for key in categories.values()}
+        for skill in self:
+            key = categories.get(skill.category)
+            if key is not None:
+                groups[key].append(skill)
+        return groups
 
 class Skill(models.Model):
     SKILL_CATEGORIES = [
@@ -28,12 +43,34 @@ class Skill(models.Model):
     is_featured = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     
+    objects = SkillQuerySet.as_manager()
+    
     class Meta:
         ordering = ['category', 'order', 'name']
     
     def __str__(self):
         return f"{self.name} ({self.get_proficiency_display()})"
 
+class ProjectQuerySet(models.QuerySet):
+    def for_cards(self):
+        """
+        Load everything a project card renders without per-row queries.
+
+        Technologies are prefetched and their number is annotated as
+        ``technology_count``. The count is a correlated subquery so it stays
+        correct when the queryset is also filtered across the same M2M join.
+        """
+        technology_count = (
+            Project.technologies.through.objects
+            .filter(project=models.OuterRef('pk'))
+            .values('project')
+            .annotate(count=models.Count('*'))
+            .values('count')
+        )
+        return self.prefetch_related('technologies').annotate(
+            technology_count=Coalesce(models.Subquery(technology_count), 0)
+        )
+
 class Project(models.Model):
     PROJECT_STATUS = [
         ('completed', 'Completed'),
@@ -56,6 +93,8 @@ class Project(models.Model):
     description = models.TextField()
     detailed_description = models.TextField(blank=True)
     image = models.ImageField(upload_to='projects/', blank=True, null=True)
+    # Resized WebP/AVIF copies of image, built in the background by home.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     project_type = models.CharField(max_length=20, choices=PROJECT_TYPES, default='web_app')
     status = models.CharField(max_length=20, choices=PROJECT_STATUS, default='completed')
     technologies = models.ManyToManyField(Skill, blank=True)
@@ -65,24 +104,98 @@ class Project(models.Model):
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Title, description and technology names, kept in sync by home.search
+    search_document = models.TextField(blank=True, editable=False)
+    
+    objects = ProjectQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-is_featured', 'order', '-created_at']
+        ordering = ['-is_featured', 'order', '-created_at', 'id']
+        indexes = [
+            # Serves the listing order and keyset pagination over it
+            models.Index(fields=['-is_featured', 'order', '-created_at', 'id'], name='home_project_listing_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
     def get_absolute_url(self):
         return reverse('project_detail', kwargs={'slug': self.slug})
+
+class RelatedProject(models.Model):
+    """Precomputed recommendation of ``related`` on ``project``'s detail page"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField()
     
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.image:
-            img = Image.open(self.image.path)
-            if img.height > 600 or img.width > 800:
-                output_size = (800, 600)
-                img.thumbnail(output_size)
-                img.save(self.image.path)
+    class Meta:
+        ordering = ['project', '-score', 'related']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'related'], name='home_relatedproject_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-score'], name='home_related_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.related} for {self.project} ({self.score})"
+
+class GitHubRepository(models.Model):
+    """Sync state of a GitHub repository mirrored as a Project"""
+    repo_id = models.BigIntegerField(unique=True)
+    full_name = models.CharField(max_length=200)
+    project = models.OneToOneField(
+        Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='github_repository'
+    )
+    pushed_at = models.DateTimeField(blank=True, null=True)
+    repo_updated_at = models.DateTimeField(blank=True, null=True)
+    # Validators and bodies of the per-repository API calls, for conditional requests
+    etags = models.JSONField(default=dict, blank=True, editable=False)
+    # Hash of the project fields and technologies last derived from the repository
+    content_hash = models.CharField(max_length=64, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['full_name']
+        verbose_name = "GitHub repository"
+        verbose_name_plural = "GitHub repositories"
+    
+    def __str__(self):
+        return self.full_name
+
+class WebhookDelivery(models.Model):
+    """A GitHub webhook delivery, stored on receipt and processed by the worker"""
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('merged', 'Merged into a later push'),
+        ('failed', 'Failed'),
+    ]
+    
+    # GitHub's X-GitHub-Delivery header; redeliveries reuse it
+    delivery_id = models.CharField(max_length=100, unique=True)
+    event = models.CharField(max_length=50)
+    repo_id = models.BigIntegerField(blank=True, null=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # When a worker started applying it; 'processing' rows older than JOB_TIMEOUT were abandoned
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-received_at']
+        verbose_name_plural = "Webhook deliveries"
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='home_webhook_status_idx'),
+            models.Index(fields=['repo_id', 'status'], name='home_webhook_repo_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} {self.delivery_id} ({self.status})"
 
 class Experience(models.Model):
     EXPERIENCE_TYPES = [
@@ -116,6 +229,7 @@ class Testimonial(models.Model):
     company = models.CharField(max_length=100, blank=True)
     content = models.TextField()
     image = models.ImageField(upload_to='testimonials/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     rating = models.IntegerField(default=5, help_text="Rating out of 5")
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
@@ -142,11 +256,42 @@ class Contact(models.Model):
     def __str__(self):
         return f"Message from {self.name} - {self.subject}"
 
+class ContactNotification(models.Model):
+    """Outbox entry for the email telling the site owner about a Contact message"""
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    contact = models.OneToOneField(Contact, on_delete=models.CASCADE, related_name='notification')
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Not retried before this time after a failed attempt
+    send_after = models.DateTimeField(default=timezone.now)
+    # Token of the run sending it, so overlapping runs never send the same message
+    claim = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'send_after'], name='home_notification_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Notification for {self.contact} ({self.status})"
+
 class SiteConfiguration(models.Model):
     site_name = models.CharField(max_length=100, default="Bikal Sharma Pokharel")
     tagline = models.CharField(max_length=200, default="Aspiring Data Scientist | AI/ML Enthusiast | Backend Developer")
     bio = models.TextField(blank=True)
     profile_image = models.ImageField(upload_to='profile/', blank=True, null=True)
+    profile_image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     resume = models.FileField(upload_to='files/', blank=True, null=True)
     github_url = models.URLField(blank=True)
     linkedin_url = models.URLField(blank=True)
@@ -166,4 +311,35 @@ class SiteConfiguration(models.Model):
     def save(self, *args, **kwargs):
         if not self.pk and SiteConfiguration.objects.exists():
             raise ValueError('There can be only one SiteConfiguration instance')
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
+
+class Job(models.Model):
+    """A unit of background work, run by the ``run_worker`` command"""
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # Jobs with the same key are coalesced while one is still queued
+    key = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default='queued')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='home_job_claim_idx'),
+            models.Index(fields=['key', 'status'], name='home_job_key_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
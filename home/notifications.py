@@ -0,0 +1,197 @@
+"""Email notifications for contact form messages, sent from an outbox by the background worker."""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .cache import get_site_config
+from .jobs import JOB_TIMEOUT, enqueue, task
+from .models import ContactNotification
+
+logger = logging.getLogger(__name__)
+
+CONTACT_EMAIL_MAX_ATTEMPTS = getattr(settings, 'CONTACT_EMAIL_MAX_ATTEMPTS', 5)
+CONTACT_EMAIL_RETRY_DELAY = getattr(settings, 'CONTACT_EMAIL_RETRY_DELAY', 60)
+# Notifications sent per run; a follow-up run is queued for the rest
+CONTACT_EMAIL_BATCH_SIZE = getattr(settings, 'CONTACT_EMAIL_BATCH_SIZE', 100)
+# 'immediate': one email per message; 'digest': batched emails every CONTACT_DIGEST_INTERVAL seconds
+CONTACT_EMAIL_MODE = getattr(settings, 'CONTACT_EMAIL_MODE', 'immediate')
+CONTACT_DIGEST_INTERVAL = getattr(settings, 'CONTACT_DIGEST_INTERVAL', 60 * 60)
+CONTACT_DIGEST_SIZE = getattr(settings, 'CONTACT_DIGEST_SIZE', 100)
+
+SEND_TASK = 'contact.send_notifications'
+
+
+def notify_contact(contact):
+    """Add ``contact`` to the outbox and have the worker send it"""
+    ContactNotification.objects.create(contact=contact)
+    # A digest run already waiting keeps its time, so the interval starts at the first message
+    schedule_sending(CONTACT_DIGEST_INTERVAL if CONTACT_EMAIL_MODE == 'digest' else 0)
+
+
+def schedule_sending(delay=0):
+    enqueue(SEND_TASK, key=SEND_TASK, delay=delay)
+
+
+def build_message(contact, recipient):
+    """The notification email for one contact form message"""
+    full_message = f"""
+New contact form submission:
+
+Name: {contact.name}
+Email: {contact.email}
+Subject: {contact.subject}
+
+Message:
+{contact.message}
+"""
+    return EmailMessage(
+        subject=f'Portfolio Contact: {contact.subject}',
+        body=full_message,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[recipient],
+    )
+
+
+def build_digest(contacts, recipient, part=1, parts=1):
+    """One email listing several contact form messages"""
+    subject = f'Portfolio Contact: {len(contacts)} new messages'
+    if parts > 1:
+        subject += f' ({part}/{parts})'
+    entries = [
+        f"""From: {contact.name} <{contact.email}>
+Subject: {contact.subject}
+Received: {timezone.localtime(contact.created_at):%Y-%m-%d %H:%M}
+
+{contact.message}
+"""
+        for contact in contacts
+    ]
+    return EmailMessage(
+        subject=subject,
+        body=f'{len(contacts)} new contact form submissions:\n\n' + f'\n{"-" * 40}\n\n'.join(entries),
+        from_email=settings.EMAIL_HOST_USER,
+        to=[recipient],
+    )
+
+
+def record_failure(notification, error):
+    """Count a failed attempt and schedule the next one with exponential backoff"""
+    notification.attempts += 1
+    notification.last_error = f'{type(error).__name__}: {error}'
+    if notification.attempts >= CONTACT_EMAIL_MAX_ATTEMPTS:
+        notification.status = 'failed'
+    else:
+        notification.status = 'pending'
+        delay = CONTACT_EMAIL_RETRY_DELAY * 2 ** (notification.attempts - 1)
+        notification.send_after = timezone.now() + timedelta(seconds=delay)
+    notification.claim = ''
+    notification.save(update_fields=['attempts', 'last_error', 'status', 'send_after', 'claim'])
+    logger.warning(f'Sending {notification} failed (attempt {notification.attempts}): {error}')
+
+
+@task(SEND_TASK)
+def send_contact_notifications(digest=None):
+    """
+    Send the due notifications over one SMTP connection, returning (sent, failed).
+
+    ``digest`` overrides ``CONTACT_EMAIL_MODE`` for this run.
+    """
+    if digest is None:
+        digest = CONTACT_EMAIL_MODE == 'digest'
+    requeue_stalled_notifications()
+    now = timezone.now()
+    due = ContactNotification.objects.filter(status='pending', send_after__lte=now).order_by('send_after', 'id')
+    due = list((due if digest else due[:CONTACT_EMAIL_BATCH_SIZE]).values_list('pk', flat=True))
+
+    # Only one run wins each row; another run may have claimed some of these already
+    claim = uuid.uuid4().hex
+    if due:
+        ContactNotification.objects.filter(pk__in=due, status='pending').update(
+            status='sending', claim=claim, claimed_at=now
+        )
+    due = list(ContactNotification.objects.select_related('contact').filter(
+        status='sending', claim=claim
+    ).order_by('send_after', 'id')) if due else []
+
+    recipient = get_site_config().email if due else None
+    if digest:
+        chunks = [due[i:i + CONTACT_DIGEST_SIZE] for i in range(0, len(due), CONTACT_DIGEST_SIZE)]
+        emails = [
+            (build_digest([n.contact for n in chunk], recipient, part, len(chunks)), chunk)
+            for part, chunk in enumerate(chunks, 1)
+        ]
+    else:
+        emails = [(build_message(n.contact, recipient), [n]) for n in due]
+
+    sent, failed = deliver(emails)
+
+    if sent:
+        ContactNotification.objects.filter(pk__in=sent, status='sending', claim=claim).update(
+            status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='', claim=''
+        )
+
+    # Come back for retries and anything beyond this batch
+    pending = ContactNotification.objects.filter(status='pending')
+    if digest:
+        # Messages that arrived during this run wait for the next digest rather than pulling it forward
+        next_due = pending.filter(attempts__gt=0).aggregate(next_due=Min('send_after'))['next_due']
+        if pending.filter(attempts=0).exists():
+            next_digest = timezone.now() + timedelta(seconds=CONTACT_DIGEST_INTERVAL)
+            next_due = min(next_due, next_digest) if next_due else next_digest
+    else:
+        next_due = pending.aggregate(next_due=Min('send_after'))['next_due']
+    if next_due is not None:
+        schedule_sending(max(0, (next_due - timezone.now()).total_seconds()))
+    return len(sent), failed
+
+
+def requeue_stalled_notifications():
+    """Return notifications claimed by a run that never finished to the outbox"""
+    cutoff = timezone.now() - timedelta(seconds=JOB_TIMEOUT)
+    return ContactNotification.objects.filter(status='sending', claimed_at__lt=cutoff).update(
+        status='pending', claim=''
+    )
+
+
+def deliver(emails):
+    """
+    Send ``(message, notifications)`` pairs over one connection.
+
+    Returns the ids of the notifications whose message went out and the
+    number whose message failed; failures are recorded for a retry.
+    """
+    sent = []
+    failed = 0
+    if not emails:
+        return sent, failed
+    connection = get_connection(fail_silently=False)
+    connected = False
+    for index, (message, notifications) in enumerate(emails):
+        try:
+            if not connected:
+                connection.open()
+                connected = True
+            connection.send_messages([message])
+        except Exception as e:
+            connection.close()
+            if not connected:
+                # The server is unreachable; don't wait out a timeout per message
+                for _, postponed in emails[index:]:
+                    for notification in postponed:
+                        record_failure(notification, e)
+                    failed += len(postponed)
+                break
+            # The connection may be unusable after an error; reconnect for the next message
+            connected = False
+            for notification in notifications:
+                record_failure(notification, e)
+            failed += len(notifications)
+        else:
+            sent.extend(notification.pk for notification in notifications)
+    connection.close()
+    return sent, failed
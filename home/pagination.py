@@ -0,0 +1,134 @@
+"""Keyset (cursor) pagination, so deep pages cost the same as the first one."""
+import base64
+import binascii
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .cache import get_version
+
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    """A page of results plus the cursors leading to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by its ordering, which must end in a unique field.
+
+    ``ordering`` defaults to the queryset's own ordering, falling back to the
+    model's ``Meta.ordering``.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        ordering = ordering or queryset.query.order_by or queryset.model._meta.ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Return the page addressed by ``cursor``, or the first page"""
+        try:
+            values, backwards = self.decode_cursor(cursor) if cursor else (None, False)
+        except InvalidCursor:
+            values, backwards = None, False
+
+        queryset = self.queryset
+        if backwards:
+            queryset = queryset.reverse()
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+
+        first, last = self.encode_cursor(rows[0], True), self.encode_cursor(rows[-1], False)
+        if backwards:
+            return CursorPage(rows, next_cursor=last, previous_cursor=first if has_more else None)
+        return CursorPage(
+            rows,
+            next_cursor=last if has_more else None,
+            previous_cursor=first if values is not None else None,
+        )
+
+    def _after(self, values, backwards):
+        """Build the lexicographic "comes after ``values``" condition"""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prior_index, (prior_name, _) in enumerate(self.fields[:index]):
+                step &= Q(**{prior_name: values[prior_index]})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, obj, backwards):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        # isoformat() keeps the microseconds DjangoJSONEncoder would truncate
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        payload = json.dumps({'v': values, 'b': backwards})
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            raw_values, backwards = payload['v'], bool(payload['b'])
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise InvalidCursor(cursor)
+        if not isinstance(raw_values, list) or len(raw_values) != len(self.fields):
+            raise InvalidCursor(cursor)
+
+        opts = self.queryset.model._meta
+        try:
+            values = [
+                opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw_values)
+            ]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        return values, backwards
+
+
+def cached_count(queryset, key):
+    """Count ``queryset`` once per content version and cache the result"""
+    cache_key = f'portfolio:count:{get_version("pages")}:{key}'
+    return cache.get_or_set(cache_key, queryset.count, COUNT_CACHE_TIMEOUT)
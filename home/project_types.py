@@ -0,0 +1,96 @@
+"""Project type classification for synced repositories, by keywords in their description and topics."""
+import re
+
+from django.conf import settings
+
+DEFAULT_PROJECT_TYPE_KEYWORDS = [
+    # Specific kinds first: an "Android app" or an "AI chatbot" is not a generic web app
+    ('mobile_app', ['mobile', 'android', 'ios', 'react native', 'flutter', 'kotlin', 'swift', 'dart']),
+    ('ai_project', ['ai', 'artificial intelligence', 'chatbot', 'nlp', 'llm', 'gpt', 'computer vision']),
+    ('ml_project', [
+        'ml', 'machine learning', 'deep learning', 'neural network', 'data science',
+        'tensorflow', 'pytorch', 'keras', 'scikit learn',
+    ]),
+    ('web_app', ['web', 'website', 'web app', 'app', 'django', 'flask', 'fastapi', 'react', 'vue', 'angular', 'html']),
+    ('data_science', [
+        'data', 'analysis', 'analytics', 'visualization', 'pandas', 'numpy', 'jupyter notebook',
+    ]),
+]
+
+PROJECT_TYPE_KEYWORDS = getattr(settings, 'PROJECT_TYPE_KEYWORDS', DEFAULT_PROJECT_TYPE_KEYWORDS)
+
+DEFAULT_PROJECT_TYPE = 'other'
+
+# Lowercase ASCII letters and digits; everything else separates words, as '-' and '_' do in topics
+ASCII_WORD_CHARS = bytes(
+    byte if chr(byte).isascii() and chr(byte).isalnum() else ord(' ')
+    for byte in bytes(range(256)).lower()
+)
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def words(text):
+    """The lowercase words of ``text``, as UTF-8 bytes"""
+    if text.isascii():
+        # translate() and split() on bytes are far cheaper than a regex scan
+        return text.encode('ascii').translate(ASCII_WORD_CHARS).split()
+    return [word.encode('utf-8') for word in WORD_RE.findall(text.lower())]
+
+
+class ProjectTypeClassifier:
+    """Classify text against a ``[(project_type, [keyword, ...]), ...]`` table"""
+
+    def __init__(self, keywords, default=DEFAULT_PROJECT_TYPE):
+        self.default = default
+        self.types = []
+        # Single-word keyword -> priority of its type, and first word -> [(b' the phrase ', priority)]
+        self.words = {}
+        self.phrases = {}
+        seen = set()
+        for priority, (project_type, keyword_list) in enumerate(keywords):
+            self.types.append(project_type)
+            for keyword in keyword_list:
+                parts = words(keyword)
+                # A keyword listed twice keeps its first type
+                if not parts or tuple(parts) in seen:
+                    continue
+                seen.add(tuple(parts))
+                if len(parts) == 1:
+                    self.words[parts[0]] = priority
+                else:
+                    self.phrases.setdefault(parts[0], []).append((b' %s ' % b' '.join(parts), priority))
+        self.lookup = frozenset(self.words) | frozenset(self.phrases)
+
+    def match(self, text):
+        """The highest-priority type with a keyword in ``text``, or None"""
+        found = words(text)
+        hits = self.lookup.intersection(found)
+        if not hits:
+            return None
+        none = len(self.types)
+        best = none
+        for hit in hits:
+            priority = self.words.get(hit, none)
+            if priority < best:
+                best = priority
+        joined = None
+        for hit in hits:
+            for phrase, priority in self.phrases.get(hit, ()):
+                if priority < best:
+                    if joined is None:
+                        joined = b' %s ' % b' '.join(found)
+                    if phrase in joined:
+                        best = priority
+        return self.types[best] if best < none else None
+
+    def classify(self, description, topics=(), language=None):
+        text = '\n'.join([description or '', *topics]) if topics else description or ''
+        return self.match(text) or (language and self.match(language)) or self.default
+
+
+classifier = ProjectTypeClassifier(PROJECT_TYPE_KEYWORDS)
+
+
+def determine_project_type(description, topics=(), language=None):
+    """Project type of a repository from its description, topics and language"""
+    return classifier.classify(description, topics, language)
@@ -0,0 +1,128 @@
+"""Precomputed related projects for the project detail page."""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Project, RelatedProject
+
+RELATED_PROJECTS_LIMIT = 3
+SHARED_TECHNOLOGY_WEIGHT = 1.0
+SAME_TYPE_WEIGHT = 0.5
+
+
+class ProjectGraph:
+    """Project types and technologies, for every project or only the ones loaded"""
+
+    def __init__(self, project_ids=None):
+        self.types = {}
+        self.technologies = defaultdict(set)
+        self.by_technology = defaultdict(set)
+        self.by_type = defaultdict(set)
+        self.load(project_ids)
+
+    def load(self, project_ids=None):
+        """Add ``project_ids`` (every project when None) in two queries"""
+        projects = Project.objects.all()
+        links = Project.technologies.through.objects.all()
+        if project_ids is not None:
+            project_ids = set(project_ids) - self.types.keys()
+            if not project_ids:
+                return
+            projects = projects.filter(pk__in=project_ids)
+            links = links.filter(project_id__in=project_ids)
+        for project_id, project_type in projects.values_list('id', 'project_type'):
+            self.types[project_id] = project_type
+            self.by_type[project_type].add(project_id)
+        for project_id, skill_id in links.values_list('project_id', 'skill_id'):
+            self.technologies[project_id].add(skill_id)
+            self.by_technology[skill_id].add(project_id)
+
+    def score(self, a, b):
+        shared = len(self.technologies[a] & self.technologies[b])
+        same_type = self.types[a] == self.types[b]
+        return shared * SHARED_TECHNOLOGY_WEIGHT + (SAME_TYPE_WEIGHT if same_type else 0.0)
+
+    def top_related(self, project_id):
+        """Return the best ``(score, related_id)`` pairs for a project"""
+        candidates = set(self.by_type[self.types[project_id]])
+        for skill_id in self.technologies[project_id]:
+            candidates |= self.by_technology[skill_id]
+        candidates.discard(project_id)
+        scored = [(self.score(project_id, other), other) for other in candidates]
+        scored = [entry for entry in scored if entry[0] > 0]
+        scored.sort(key=lambda entry: (-entry[0], -entry[1]))
+        return scored[:RELATED_PROJECTS_LIMIT]
+
+
+def neighbours(project_ids):
+    """Ids of the projects sharing a type or a technology with any of ``project_ids``"""
+    through = Project.technologies.through.objects
+    skills = through.filter(project_id__in=project_ids).values('skill_id')
+    types = Project.objects.filter(pk__in=project_ids).values('project_type')
+    return set(Project.objects.filter(
+        Q(project_type__in=types) | Q(pk__in=through.filter(skill_id__in=skills).values('project_id'))
+    ).values_list('id', flat=True))
+
+
+def refresh_related_projects(project_ids):
+    """
+    Recompute recommendations after ``project_ids`` were created or changed.
+
+    Besides the changed projects themselves, a project is recomputed only if
+    it currently recommends one of them or would now rank one of them above
+    its weakest stored recommendation. Only those projects and the ones they
+    could recommend are loaded.
+    """
+    changed = set(project_ids)
+    if not changed:
+        return
+    # Projects that store a changed one, and those that could rank one now
+    referrers = set(RelatedProject.objects.filter(related_id__in=changed).values_list('project_id', flat=True))
+    graph = ProjectGraph(changed | referrers | neighbours(changed))
+
+    stored = defaultdict(list)
+    for project_id, related_id, score in RelatedProject.objects.filter(
+        project_id__in=graph.types.keys() - changed
+    ).values_list('project_id', 'related_id', 'score'):
+        stored[project_id].append((score, related_id))
+
+    live_changed = [pk for pk in changed if pk in graph.types]
+    affected = set(live_changed)
+    for project_id in graph.types:
+        if project_id in changed:
+            continue
+        entries = stored.get(project_id, [])
+        if any(related_id in changed for _, related_id in entries):
+            affected.add(project_id)
+            continue
+        # Weakest stored entry, compared the same way top_related() ranks
+        floor = min(entries) if len(entries) >= RELATED_PROJECTS_LIMIT else (0.0, 0)
+        if any((graph.score(project_id, other), other) > floor for other in live_changed):
+            affected.add(project_id)
+
+    # Everything the affected projects could recommend
+    if affected:
+        graph.load(neighbours(affected))
+    rows = [
+        RelatedProject(project_id=project_id, related_id=related_id, score=score)
+        for project_id in affected
+        for score, related_id in graph.top_related(project_id)
+    ]
+    with transaction.atomic():
+        RelatedProject.objects.filter(project_id__in=affected).delete()
+        RelatedProject.objects.bulk_create(rows)
+
+
+def rebuild_related_projects():
+    """Recompute recommendations for every project"""
+    graph = ProjectGraph()
+    rows = [
+        RelatedProject(project_id=project_id, related_id=related_id, score=score)
+        for project_id in graph.types
+        for score, related_id in graph.top_related(project_id)
+    ]
+    with transaction.atomic():
+        RelatedProject.objects.all().delete()
+        RelatedProject.objects.bulk_create(rows)
+    return len(rows)
@@ -0,0 +1,111 @@
+"""Full-text search over projects: FTS5 on SQLite, a GIN index on PostgreSQL, ``icontains`` elsewhere."""
+import re
+
+from django.db import connection
+from django.db.models import Prefetch
+
+from .models import Project, Skill
+
+FTS_TABLE = 'home_project_fts'
+
+# bm25() weights for the title, description and technologies columns
+FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Whether the FTS5 table exists, per SQLite database file
+_fts_tables = {}
+
+
+def build_search_document(title, description, technologies):
+    """Join the searchable project fields into a single document"""
+    return '\n'.join([title, description, ' '.join(technologies)])
+
+
+def has_fts_table():
+    """Check whether the SQLite FTS5 table was created by the migration"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = str(connection.settings_dict['NAME'])
+    if name not in _fts_tables:
+        _fts_tables[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[name]
+
+
+def fts_match_expression(query):
+    """Turn free text into a safe FTS5 query matching every word as a prefix"""
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query.lower()))
+
+
+def search_projects(queryset, query):
+    """Filter a Project queryset by ``query`` and order it by relevance"""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        # Compiles to the expression of the GIN index created in migration 0002
+        vector = SearchVector('search_document', config='english')
+        tsquery = SearchQuery(query, search_type='websearch', config='english')
+        return (
+            queryset.alias(search_vector=vector)
+            .filter(search_vector=tsquery)
+            .annotate(search_rank=SearchRank(vector, tsquery))
+            .order_by('-search_rank', *Project._meta.ordering)
+        )
+
+    if has_fts_table():
+        match = fts_match_expression(query)
+        if not match:
+            return queryset.none()
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        return queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = home_project.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('search_rank', *Project._meta.ordering)
+
+    return queryset.filter(search_document__icontains=query)
+
+
+def update_search_index(project_ids):
+    """Refresh the search document and index rows of the given projects"""
+    projects = list(
+        Project.objects.filter(pk__in=project_ids)
+        .only('id', 'title', 'description', 'search_document')
+        .prefetch_related(Prefetch('technologies', queryset=Skill.objects.only('id', 'name')))
+    )
+
+    changed = []
+    fts_rows = []
+    for project in projects:
+        technologies = [skill.name for skill in project.technologies.all()]
+        document = build_search_document(project.title, project.description, technologies)
+        if document != project.search_document:
+            project.search_document = document
+            changed.append(project)
+        fts_rows.append((project.pk, project.title, project.description, ' '.join(technologies)))
+
+    if changed:
+        Project.objects.bulk_update(changed, ['search_document'])
+
+    if fts_rows and has_fts_table():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(row[0],) for row in fts_rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, technologies) '
+                f'VALUES (%s, %s, %s, %s)',
+                fts_rows,
+            )
+
+
+def remove_from_search_index(project_ids):
+    """Drop index rows for deleted projects"""
+    if project_ids and has_fts_table():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk in project_ids],
+            )
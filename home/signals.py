@@ -0,0 +1,122 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_version
+from .images import schedule_derivatives
+from .models import Experience, Project, RelatedProject, SiteConfiguration, Skill, Testimonial
+from .related import refresh_related_projects
+from .search import remove_from_search_index, update_search_index
+
+# Models whose content is rendered on the public pages
+PUBLIC_CONTENT_MODELS = (Project, Skill, Experience, Testimonial, SiteConfiguration)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_public_pages(sender, **kwargs):
+    """Drop cached public pages when their content changes"""
+    if sender is SiteConfiguration:
+        bump_version('pages', 'site_config')
+    elif sender is Skill:
+        # Cached skill items are keyed on this version; project cards on updated_at
+        bump_version('pages', 'model:skill')
+    elif sender in PUBLIC_CONTENT_MODELS:
+        bump_version('pages')
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+@receiver(m2m_changed, sender=Experience.skills_gained.through)
+def invalidate_public_pages_m2m(sender, action, **kwargs):
+    """Drop cached public pages when related skills change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version('pages')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Testimonial)
+def queue_image_derivatives(sender, instance, **kwargs):
+    """Rebuild responsive image sizes in the background after an upload"""
+    schedule_derivatives(instance, 'image')
+
+
+@receiver(post_save, sender=SiteConfiguration)
+def queue_profile_image_derivatives(sender, instance, **kwargs):
+    """Rebuild responsive profile image sizes in the background after an upload"""
+    schedule_derivatives(instance, 'profile_image')
+
+
+@receiver(pre_save, sender=Project)
+def check_project_type(sender, instance, **kwargs):
+    """Note whether a save changes the type used to relate projects"""
+    previous_type = None
+    if instance.pk:
+        previous_type = sender.objects.filter(pk=instance.pk).values_list('project_type', flat=True).first()
+    instance._project_type_changed = previous_type != instance.project_type
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, created, **kwargs):
+    """Keep the search index and related projects in step with project edits"""
+    update_search_index([instance.pk])
+    if created or getattr(instance, '_project_type_changed', True):
+        refresh_related_projects([instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_referrers(sender, instance, **kwargs):
+    """Capture the projects recommending this one before the rows cascade"""
+    instance._related_referrers = list(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    """Remove deleted projects from the search index and recommendations"""
+    remove_from_search_index([instance.pk])
+    refresh_related_projects(getattr(instance, '_related_referrers', []))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def index_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    """Re-index projects whose technologies were added or removed"""
+    if action == 'pre_clear' and reverse:
+        # pk_set is not provided for clear(), so remember the projects first
+        instance._technology_project_ids = list(instance.project_set.values_list('pk', flat=True))
+        return
+    if action in ('post_add', 'post_remove'):
+        project_ids = pk_set if reverse else [instance.pk]
+    elif action == 'post_clear':
+        project_ids = getattr(instance, '_technology_project_ids', []) if reverse else [instance.pk]
+    else:
+        return
+    # Project cards are cached by updated_at, which add()/remove() leave alone
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+    update_search_index(project_ids)
+    refresh_related_projects(project_ids)
+
+
+@receiver(post_save, sender=Skill)
+def index_skill_projects(sender, instance, created, **kwargs):
+    """Re-index projects using a skill whose name may have changed"""
+    if not created:
+        project_ids = list(instance.project_set.values_list('pk', flat=True))
+        # Their cached cards show the skill name and are keyed on updated_at
+        Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+        update_search_index(project_ids)
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_skill_projects(sender, instance, **kwargs):
+    """Capture the projects of a skill before its M2M rows are deleted"""
+    instance._technology_project_ids = list(instance.project_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def index_deleted_skill_projects(sender, instance, **kwargs):
+    """Re-index and re-relate projects that lost a deleted skill"""
+    project_ids = getattr(instance, '_technology_project_ids', [])
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+    update_search_index(project_ids)
+    refresh_related_projects(project_ids)
@@ -0,0 +1,144 @@
+import json
+import re
+from urllib.parse import quote
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..images import derivatives_current
+
+register = template.Library()
+
+# Contents of inlined static files, read once per process
+_inline_cache = {}
+
+# Written by the vendor_assets command; None until it has been run
+VENDOR_MANIFEST = 'vendor/manifest.json'
+_vendor_manifest = {}
+
+# Used when the assets have not been vendored yet, e.g. on a fresh checkout
+CDN_STYLESHEETS = mark_safe(
+    '<link rel="preconnect" href="https://fonts.googleapis.com">\n'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n'
+    '<link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900'
+    '&family=JetBrains+Mono:wght@400;500;600&display=swap" rel="stylesheet">\n'
+    '<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">\n'
+    '<link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">\n'
+    '<link href="https://unpkg.com/aos@2.3.1/dist/aos.css" rel="stylesheet">'
+)
+CDN_SCRIPTS = mark_safe(
+    '<script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>\n'
+    '<script src="https://unpkg.com/aos@2.3.1/dist/aos.js"></script>'
+)
+
+
+def get_vendor_manifest():
+    """Load the vendored asset list once per process"""
+    if 'manifest' not in _vendor_manifest:
+        path = finders.find(VENDOR_MANIFEST)
+        manifest = None
+        if path is not None:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        _vendor_manifest['manifest'] = manifest
+    return _vendor_manifest['manifest']
+
+
+@register.simple_tag
+def inline_static(path):
+    """Inline the contents of a static file, e.g. critical CSS"""
+    if path not in _inline_cache:
+        absolute_path = finders.find(path)
+        if absolute_path is None:
+            raise template.TemplateSyntaxError(f"Static file '{path}' could not be found")
+        with open(absolute_path, encoding='utf-8') as f:
+            content = f.read()
+        if path.endswith('.css'):
+            # Strip comments and indentation; every byte is repeated per page
+            content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+            content = re.sub(r'\s*\n\s*', '', content)
+        _inline_cache[path] = mark_safe(content.strip())
+    return _inline_cache[path]
+
+
+@register.simple_tag
+def vendor_stylesheets():
+    """Font preload hints and stylesheets for the third-party libraries"""
+    manifest = get_vendor_manifest()
+    if manifest is None:
+        return CDN_STYLESHEETS
+    preloads = format_html_join(
+        '\n', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(path),) for path in manifest['preload'])
+    )
+    stylesheets = format_html_join(
+        '\n', '<link rel="stylesheet" href="{}">', ((static(path),) for path in manifest['css'])
+    )
+    return format_html('{}\n{}', preloads, stylesheets)
+
+
+@register.simple_tag
+def vendor_scripts():
+    """Script tags for the third-party libraries"""
+    manifest = get_vendor_manifest()
+    if manifest is None:
+        return CDN_SCRIPTS
+    return format_html_join('\n', '<script src="{}"></script>', ((static(path),) for path in manifest['js']))
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes='100vw', **attrs):
+    """
+    Render an image field as a ``<picture>`` with WebP/AVIF ``srcset``s.
+
+    Extra keyword arguments become attributes of the ``<img>``. Once the
+    derivatives are built the image also gets its intrinsic ``width`` and
+    ``height`` and a blurred inline placeholder, so it takes its final size
+    and paints immediately. Images whose derivatives are missing or out of
+    date render as the original alone.
+    """
+    if not field_file:
+        return ''
+    instance = field_file.instance
+    record = getattr(instance, f'{field_file.field.name}_derivatives', None) or {}
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    if not derivatives_current(instance, field_file.field.name):
+        return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    attrs.setdefault('width', record['width'])
+    attrs.setdefault('height', record['height'])
+    if record.get('placeholder'):
+        attrs['class'] = ' '.join(filter(None, [attrs.get('class'), 'lqip']))
+        attrs['style'] = ';'.join(filter(None, [
+            attrs.get('style', '').rstrip('; '),
+            f"background-image:url(\"{blurred_placeholder(record)}\")",
+        ]))
+    img = format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    srcsets = {}
+    for variant in record.get('variants', []):
+        srcsets.setdefault(variant['type'], []).append(
+            f"{field_file.storage.url(variant['name'])} {variant['width']}w"
+        )
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((mime, ', '.join(srcset), sizes) for mime, srcset in srcsets.items())
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
+
+
+def blurred_placeholder(record):
+    """Wrap the micro-thumbnail in an SVG blur so it upscales smoothly"""
+    svg = (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {record['width']} {record['height']}'>"
+        "<filter id='b' color-interpolation-filters='sRGB'><feGaussianBlur stdDeviation='20'/>"
+        "<feComponentTransfer><feFuncA type='discrete' tableValues='1 1'/></feComponentTransfer></filter>"
+        f"<image width='100%' height='100%' preserveAspectRatio='none' filter='url(#b)' href='{record['placeholder']}'/>"
+        "</svg>"
+    )
+    return 'data:image/svg+xml,' + quote(svg, safe=" =:/'(),;")
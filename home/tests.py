@@ -0,0 +1,352 @@
+import json
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core import mail
+from django.core.cache import caches
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import cache as page_cache
+from . import notifications
+from .github import DictStore, GitHubClient, RateLimitExceeded
+from .jobs import JOB_TIMEOUT
+from .models import Contact, ContactNotification, Job, Project, SiteConfiguration, Skill, WebhookDelivery
+from .throttle import CONTACT_THROTTLE_IP, throttle_stats
+from .webhooks import requeue_stalled_deliveries
+
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in ('default', 'shared', 'throttle')
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PageTestCase(TestCase):
+    """Render pages cold: no cached pages, fragments or site configuration"""
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteConfiguration.objects.create()
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        page_cache._site_config = None
+
+    def get(self, url):
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class SkillCategoryQueryTests(PageTestCase):
+    """The skill sections cost the same number of queries however many categories are used"""
+
+    def add_skills(self, categories, per_category=4):
+        Skill.objects.bulk_create(
+            Skill(name=f'{category} {i}', category=category, is_featured=True)
+            for category in categories
+            for i in range(per_category)
+        )
+
+    def assert_constant_queries(self, url, queries):
+        categories = [value for value, _ in Skill.SKILL_CATEGORIES]
+        for used in (0, 1, len(categories)):
+            with self.subTest(categories=used):
+                Skill.objects.all().delete()
+                self.add_skills(categories[:used])
+                self.setUp()
+                with self.assertNumQueries(queries):
+                    self.get(url)
+
+    def test_home(self):
+        self.assert_constant_queries(reverse('home'), 4)
+
+    def test_about(self):
+        self.assert_constant_queries(reverse('about'), 2)
+
+
+class ProjectListingQueryTests(PageTestCase):
+    """Project cards load their technologies in bulk, so listing 1,000 projects stays cheap"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        skills = Skill.objects.bulk_create(Skill(name=f'Skill {i}', category='tools') for i in range(10))
+        projects = Project.objects.bulk_create(
+            Project(title=f'Project {i}', slug=f'project-{i}', description='A project', is_featured=i % 7 == 0)
+            for i in range(1000)
+        )
+        Project.technologies.through.objects.bulk_create(
+            Project.technologies.through(project_id=project.pk, skill_id=skills[(project.pk + n) % 10].pk)
+            for project in projects
+            for n in range(3)
+        )
+
+    def test_for_cards_annotates_technology_count(self):
+        with self.assertNumQueries(2):
+            cards = list(Project.objects.for_cards()[:100])
+        with self.assertNumQueries(0):
+            for project in cards:
+                self.assertEqual(project.technology_count, 3)
+                self.assertEqual(len(project.technologies.all()), 3)
+
+    def test_cursor_pages(self):
+        with self.assertNumQueries(5):
+            response = self.get(reverse('projects'))
+        self.assertEqual(response.context['total_count'], 1000)
+        # Later pages continue from the cursor and reuse the cached total and site configuration
+        for _ in range(3):
+            cursor = response.context['projects'].next_cursor
+            with self.assertNumQueries(3):
+                response = self.get(f"{reverse('projects')}?cursor={cursor}")
+
+    def test_numbered_page(self):
+        with self.assertNumQueries(5):
+            response = self.get(f"{reverse('projects')}?page=100")
+        self.assertEqual(len(response.context['projects']), 9)
+
+
+class ProjectCardCacheTests(PageTestCase):
+    """Cached project cards are keyed on updated_at, which skill edits touch"""
+
+    def setUp(self):
+        super().setUp()
+        self.skill = Skill.objects.create(name='Wagtail', category='framework')
+        self.project = Project.objects.create(title='Portfolio', slug='portfolio', description='A project')
+        self.project.technologies.add(self.skill)
+        self.assertContains(self.get(reverse('projects')), 'Wagtail')
+
+    def test_renamed_skill_shows_on_cached_card(self):
+        self.skill.name = 'Flask'
+        self.skill.save()
+        response = self.get(reverse('projects'))
+        self.assertContains(response, 'Flask')
+        self.assertNotContains(response, 'Wagtail')
+
+    def test_deleted_skill_leaves_cached_card(self):
+        self.skill.delete()
+        self.assertNotContains(self.get(reverse('projects')), 'Wagtail')
+
+
+class ContactThrottleTests(PageTestCase):
+    def post(self, n, ip='192.0.2.1'):
+        return self.client.post(reverse('contact'), {
+            'name': 'Visitor', 'email': f'visitor{n}@example.com', 'subject': 'Hello', 'message': f'Message {n}',
+        }, secure=True, REMOTE_ADDR=ip, HTTP_X_REAL_IP=ip)
+
+    def test_throttled_post_touches_no_database(self):
+        burst = CONTACT_THROTTLE_IP[0]
+        self.get(reverse('contact'))
+        for n in range(burst):
+            self.assertEqual(self.post(n).status_code, 302)
+        # The site configuration for the error page was cached by the first GET
+        for n in range(burst, burst + 2):
+            with self.assertNumQueries(0):
+                response = self.post(n)
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+        self.assertEqual(Contact.objects.count(), burst)
+        self.assertEqual(throttle_stats()['throttled_ip'], 2)
+        self.assertEqual(throttle_stats()['accepted'], burst)
+
+
+class RecordingBackend(EmailBackend):
+    """locmem backend counting the connections it opens; ``on_send`` runs before each send"""
+    opened = 0
+    on_send = None
+
+    def open(self):
+        RecordingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if RecordingBackend.on_send:
+            RecordingBackend.on_send()
+        return super().send_messages(messages)
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise smtplib.SMTPException('Mailbox unavailable')
+
+
+@override_settings(EMAIL_BACKEND='home.tests.RecordingBackend')
+class ContactOutboxTests(PageTestCase):
+    def setUp(self):
+        super().setUp()
+        RecordingBackend.opened = 0
+        RecordingBackend.on_send = None
+
+    def add_contacts(self, count):
+        for n in range(count):
+            contact = Contact.objects.create(name='Visitor', email='v@example.com', subject=f'Hello {n}', message='Hi')
+            ContactNotification.objects.create(contact=contact)
+
+    def test_post_only_queues_the_email(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('contact'), {
+                'name': 'Visitor', 'email': 'v@example.com', 'subject': 'Hello', 'message': 'Hi',
+            }, secure=True)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(ContactNotification.objects.get().status, 'pending')
+        self.assertTrue(Job.objects.filter(task=notifications.SEND_TASK, status='queued').exists())
+
+    def test_due_notifications_share_one_connection(self):
+        self.add_contacts(3)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(notifications.send_contact_notifications(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(RecordingBackend.opened, 1)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "home_contactnotification"')]
+        # Requeue stalled rows, claim the due ones, then mark them all sent at once
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(len([sql for sql in updates if "'sent'" in sql]), 1)
+        self.assertEqual(set(ContactNotification.objects.values_list('status', flat=True)), {'sent'})
+
+    @override_settings(EMAIL_BACKEND='home.tests.FailingBackend')
+    def test_failure_backs_off(self):
+        self.add_contacts(1)
+        with self.assertLogs('home.notifications', 'WARNING'):
+            self.assertEqual(notifications.send_contact_notifications(), (0, 1))
+        notification = ContactNotification.objects.get()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn('Mailbox unavailable', notification.last_error)
+        delay = (notification.send_after - timezone.now()).total_seconds()
+        self.assertAlmostEqual(delay, notifications.CONTACT_EMAIL_RETRY_DELAY, delta=5)
+
+    def test_overlapping_run_sends_nothing(self):
+        self.add_contacts(2)
+        overlapping = []
+        # Start a second run while the first is sending its first message
+        RecordingBackend.on_send = lambda: overlapping or overlapping.append(
+            notifications.send_contact_notifications()
+        )
+        self.assertEqual(notifications.send_contact_notifications(), (2, 0))
+        self.assertEqual(overlapping, [(0, 0)])
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class WebhookDeliveryTests(TestCase):
+    def delivery(self, delivery_id, claimed_ago):
+        return WebhookDelivery.objects.create(
+            delivery_id=delivery_id, event='repository', status='processing', attempts=1,
+            claimed_at=timezone.now() - timedelta(seconds=claimed_ago),
+            payload={'action': 'edited', 'repository': {'id': 1, 'name': 'site'}},
+        )
+
+    def test_abandoned_delivery_is_requeued(self):
+        stalled = self.delivery('stalled', JOB_TIMEOUT + 60)
+        running = self.delivery('running', 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(requeue_stalled_deliveries(), 1)
+        stalled.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stalled.status, 'pending')
+        self.assertEqual(running.status, 'processing')
+        job = Job.objects.get(task='github.process_delivery')
+        self.assertEqual(job.payload, {'delivery_id': 'stalled'})
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Answers with the responses queued on the server for each path, recording every request"""
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.server.requests.append((self.path, dict(self.headers)))
+        status, headers, body = self.server.responses[path].pop(0)
+        payload = b'' if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GitHubClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.server.responses = {}
+        self.server.requests = []
+        self.slept = []
+        self.client = GitHubClient(api_url=self.api_url, sleep=self.slept.append)
+
+    def respond(self, path, *responses):
+        self.server.responses.setdefault(path, []).extend(responses)
+
+    def test_paginate_follows_link_header(self):
+        next_url = f'{self.api_url}/users/me/repos?per_page=100&page=2'
+        self.respond('/users/me/repos', (200, {'Link': f'<{next_url}>; rel="next"'}, [1, 2]), (200, {}, [3]))
+
+        self.assertEqual(list(self.client.paginate('/users/me/repos')), [1, 2, 3])
+        self.assertEqual(
+            [path for path, _ in self.server.requests],
+            ['/users/me/repos?per_page=100', '/users/me/repos?per_page=100&page=2'],
+        )
+
+    def test_not_modified_reuses_cached_body(self):
+        store = DictStore()
+        self.respond('/repos/me/site/topics', (200, {'ETag': '"v1"'}, {'names': ['django']}), (304, {}, None))
+
+        first = self.client.get_json('/repos/me/site/topics', store=store)
+        second = self.client.get_json('/repos/me/site/topics', store=store)
+        self.assertEqual(second, first)
+        self.assertEqual(second, {'names': ['django']})
+        self.assertEqual(self.client.stats['not_modified'], 1)
+        self.assertNotIn('If-None-Match', self.server.requests[0][1])
+        self.assertEqual(self.server.requests[1][1]['If-None-Match'], '"v1"')
+
+    def test_retry_after_is_waited_out(self):
+        self.respond('/rate', (403, {'Retry-After': '7'}, {}), (200, {}, {'ok': True}))
+
+        self.assertEqual(self.client.get_json('/rate'), {'ok': True})
+        self.assertEqual(self.slept, [7.0])
+        self.assertEqual(self.client.stats['retries'], 1)
+
+    def test_exhausted_rate_limit_delays_next_request(self):
+        reset = int(time.time()) + 30
+        self.respond('/a', (200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)}, {}))
+        self.respond('/b', (200, {}, {}))
+
+        self.client.get_json('/a')
+        self.assertEqual(self.slept, [])
+        self.client.get_json('/b')
+        self.assertEqual(len(self.slept), 1)
+        self.assertAlmostEqual(self.slept[0], reset + 1 - time.time(), delta=2)
+
+    def test_wait_beyond_limit_raises(self):
+        self.respond('/rate', (429, {'Retry-After': '3600'}, {}))
+
+        with self.assertRaises(RateLimitExceeded):
+            self.client.get_json('/rate')
+        self.assertEqual(self.slept, [])
+        self.assertEqual(len(self.server.requests), 1)
@@ -0,0 +1,73 @@
+"""Rate limiting for the contact form; ``CONTACT_THROTTLE_CACHE_ALIAS`` must name a cache shared by all workers."""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# (bucket size, seconds per token)
+CONTACT_THROTTLE_IP = getattr(settings, 'CONTACT_THROTTLE_IP', (5, 60))
+CONTACT_THROTTLE_EMAIL = getattr(settings, 'CONTACT_THROTTLE_EMAIL', (3, 5 * 60))
+CONTACT_DUPLICATE_WINDOW = getattr(settings, 'CONTACT_DUPLICATE_WINDOW', 60 * 60)
+CONTACT_THROTTLE_CACHE_ALIAS = getattr(settings, 'CONTACT_THROTTLE_CACHE_ALIAS', 'default')
+# Request header carrying the client address behind a proxy, e.g. 'HTTP_X_REAL_IP'
+CLIENT_IP_HEADER = getattr(settings, 'CLIENT_IP_HEADER', None)
+
+THROTTLE_KEY_PREFIX = 'portfolio:throttle'
+COUNTERS = ('accepted', 'throttled_ip', 'throttled_email', 'duplicates')
+
+
+def client_ip(request):
+    if CLIENT_IP_HEADER and request.META.get(CLIENT_IP_HEADER):
+        # X-Forwarded-For lists the client first
+        return request.META[CLIENT_IP_HEADER].split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hashed(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def take_token(name, value, rate):
+    """
+    Take a token from the bucket for ``value``.
+
+    Returns 0 if one was available, otherwise the seconds until there is one.
+    """
+    capacity, interval = rate
+    store = caches[CONTACT_THROTTLE_CACHE_ALIAS]
+    key = f'{THROTTLE_KEY_PREFIX}:{name}:{hashed(value)}'
+    now = time.time()
+    tokens, updated = store.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) / interval)
+    if tokens < 1:
+        return (1 - tokens) * interval
+    # A bucket left alone this long is full again, so it may expire
+    store.set(key, (tokens - 1, now), capacity * interval)
+    return 0
+
+
+def is_duplicate(email, subject, message):
+    """Whether this exact message from ``email`` was already received within the window"""
+    digest = hashed('\0'.join([email.strip().lower(), subject.strip(), message.strip()]))
+    store = caches[CONTACT_THROTTLE_CACHE_ALIAS]
+    return not store.add(f'{THROTTLE_KEY_PREFIX}:message:{digest}', 1, CONTACT_DUPLICATE_WINDOW)
+
+
+def count(counter):
+    # Kept in the cache so a rejected POST never writes to the database
+    store = caches[CONTACT_THROTTLE_CACHE_ALIAS]
+    key = f'{THROTTLE_KEY_PREFIX}:count:{counter}'
+    store.add(key, 0, None)
+    try:
+        store.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        store.set(key, 1, None)
+
+
+def throttle_stats():
+    """Totals of accepted, throttled and duplicate contact POSTs"""
+    store = caches[CONTACT_THROTTLE_CACHE_ALIAS]
+    values = store.get_many([f'{THROTTLE_KEY_PREFIX}:count:{counter}' for counter in COUNTERS])
+    return {counter: values.get(f'{THROTTLE_KEY_PREFIX}:count:{counter}', 0) for counter in COUNTERS}
@@ -1,49 +1,40 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from django.core.paginator import Paginator
 from .models import *
+from .cache import cache_public_page, conditional_page
+from .pagination import CursorPaginator, cached_count
+from .notifications import notify_contact
+from .search import search_projects
+from .throttle import (
+    CONTACT_THROTTLE_EMAIL, CONTACT_THROTTLE_IP, client_ip, count, is_duplicate, take_token,
+)
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
-def get_site_config():
-    """Get or create site configuration singleton"""
-    # Grab the singleton if it exists
-    config = SiteConfiguration.objects.first()
-    if config:
-        return config
-
-    # Otherwise create the very first one
-    return SiteConfiguration.objects.create(
-        site_name='Bikal Sharma Pokharel',
-        tagline='Aspiring Data Scientist | AI/ML Enthusiast | Backend Developer',
-        bio='''BSc Computer Science Student passionate about solving real-world problems 
-                     through technology. Experienced in full-stack development, machine learning, 
-                     and digital marketing.''',
-        email='pokharelbikalsharma@gmail.com',
-        location='Nepal',
-        years_experience=2
-    )
+PROJECTS_PER_PAGE = 9
 
+@conditional_page(lambda request: Project.objects.filter(is_featured=True))
+@cache_public_page
 def home(request):
     """Home page view"""
-    config = get_site_config()
-    featured_projects = Project.objects.filter(is_featured=True)[:6]
+    featured_projects = list(Project.objects.filter(is_featured=True).for_cards()[:6])
     skills = Skill.objects.filter(is_featured=True)
     
     # Categorize skills
-    skill_categories = {
-        'programming': skills.filter(category='programming'),
-        'frameworks': skills.filter(category='frameworks'),
-        'tools': skills.filter(category='tools'),
-        'cloud': skills.filter(category='cloud'),
-    }
+    skill_categories = skills.grouped_by_category({
+        'programming': 'programming',
+        'frameworks': 'frameworks',
+        'tools': 'tools',
+        'cloud': 'cloud',
+    })
     
     context = {
-        'config': config,
         'projects': featured_projects,
         'skills': skills,
         'skill_categories': skill_categories,
@@ -51,32 +42,25 @@ def home(request):
     }
     return render(request, 'home/index.html', context)
 
+@cache_public_page
 def about(request):
     """About page view"""
-    config = get_site_config()
-    all_skills = Skill.objects.all()
-    
     # Categorize skills for about page
-    skill_categories = {
-        'Programming Languages': all_skills.filter(category='programming'),
-        'Frameworks & Libraries': all_skills.filter(category='frameworks'),
-        'Databases': all_skills.filter(category='databases'),
-        'Tools & Technologies': all_skills.filter(category='tools'),
-        'Cloud & DevOps': all_skills.filter(category='cloud'),
-        'Other Skills': all_skills.filter(category='other'),
-    }
+    skill_categories = Skill.objects.all().grouped_by_category(
+        dict(Skill.SKILL_CATEGORIES)
+    )
     
     context = {
-        'config': config,
         'skill_categories': skill_categories,
         'page_title': 'About Me'
     }
     return render(request, 'home/about.html', context)
 
+@conditional_page(lambda request: Project.objects.all())
+@cache_public_page
 def projects(request):
     """Projects page view"""
-    config = get_site_config()
-    all_projects = Project.objects.all()
+    all_projects = Project.objects.for_cards()
     
     # Filter by type if specified
     project_type = request.GET.get('type')
@@ -86,23 +70,34 @@ def projects(request):
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        all_projects = all_projects.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(technologies__name__icontains=search_query)
-        ).distinct()
+        all_projects = search_projects(all_projects, search_query)
     
-    # Pagination
-    paginator = Paginator(all_projects, 9)
-    page_number = request.GET.get('page')
-    projects_page = paginator.get_page(page_number)
+    # Pagination: ranked search results and explicit ?page= links keep
+    # numbered pages, everything else continues from an opaque cursor
+    cursor_mode = (
+        getattr(settings, 'PROJECTS_PAGINATION', 'page') == 'cursor'
+        and not search_query
+        and 'page' not in request.GET
+    )
+    if cursor_mode:
+        paginator = CursorPaginator(all_projects, PROJECTS_PER_PAGE)
+        projects_page = paginator.get_page(request.GET.get('cursor'))
+        total_count = None
+        if getattr(settings, 'PROJECTS_SHOW_TOTAL', True):
+            total_count = cached_count(all_projects, f'projects:{project_type or ""}')
+    else:
+        paginator = Paginator(all_projects, PROJECTS_PER_PAGE)
+        page_number = request.GET.get('page')
+        projects_page = paginator.get_page(page_number)
+        total_count = paginator.count
     
     # Get project types for filter
     project_types = Project.PROJECT_TYPES
     
     context = {
-        'config': config,
         'projects': projects_page,
+        'cursor_mode': cursor_mode,
+        'total_count': total_count,
         'project_types': project_types,
         'current_type': project_type,
         'search_query': search_query,
@@ -110,16 +105,20 @@ def projects(request):
     }
     return render(request, 'home/projects.html', context)
 
+@conditional_page(lambda request, slug: Project.objects.filter(
+    Q(slug=slug) | Q(related_to__project__slug=slug)
+))
+@cache_public_page
 def project_detail(request, slug):
     """Project detail view"""
-    config = get_site_config()
-    project = get_object_or_404(Project, slug=slug)
-    related_projects = Project.objects.filter(
-        project_type=project.project_type
-    ).exclude(id=project.id)[:3]
+    project = get_object_or_404(Project.objects.prefetch_related('technologies'), slug=slug)
+    related_projects = (
+        Project.objects.for_cards()
+        .filter(related_to__project=project)
+        .order_by('-related_to__score', 'id')
+    )
     
     context = {
-        'config': config,
         'project': project,
         'related_projects': related_projects,
         'page_title': project.title
@@ -129,54 +128,55 @@ def project_detail(request, slug):
 
 def contact(request):
     """Contact page view"""
-    config = get_site_config()
-    
     if request.method == 'POST':
+        # Shed load before any database or email work
+        retry_after = take_token('ip', client_ip(request), CONTACT_THROTTLE_IP)
+        if retry_after:
+            count('throttled_ip')
+            return contact_throttled(request, retry_after)
+        
         name = request.POST.get('name')
         email = request.POST.get('email')
         subject = request.POST.get('subject')
         message = request.POST.get('message')
         
         if name and email and subject and message:
-            # Save to database
-            contact_obj = Contact.objects.create(
-                name=name,
-                email=email,
-                subject=subject,
-                message=message
-            )
+            retry_after = take_token('email', email.strip().lower(), CONTACT_THROTTLE_EMAIL)
+            if retry_after:
+                count('throttled_email')
+                return contact_throttled(request, retry_after)
+            if is_duplicate(email, subject, message):
+                # Most likely a double submit; the first copy is already saved
+                count('duplicates')
+                messages.success(request, 'Thank you for your message! I\'ll get back to you soon.')
+                return redirect('contact')
+            count('accepted')
             
-            # Send email notification
-            try:
-                full_message = f"""
-New contact form submission:
-
-Name: {name}
-Email: {email}
-Subject: {subject}
-
-Message:
-{message}
-"""
-                send_mail(
-                    subject=f'Portfolio Contact: {subject}',
-                    message=full_message,
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[config.email],
-                    fail_silently=False,
+            # Save to database; the notification email is sent by the background worker
+            with transaction.atomic():
+                contact_obj = Contact.objects.create(
+                    name=name,
+                    email=email,
+                    subject=subject,
+                    message=message
                 )
-                messages.success(request, 'Thank you for your message! I\'ll get back to you soon.')
-                logger.info(f'Contact form submitted by {email}')
-            except Exception as e:
-                messages.success(request, 'Message saved! I\'ll get back to you soon.')
-                logger.error(f'Email sending failed: {str(e)}')
+                notify_contact(contact_obj)
+            
+            messages.success(request, 'Thank you for your message! I\'ll get back to you soon.')
+            logger.info(f'Contact form submitted by {email}')
             
             return redirect('contact')
         else:
             messages.error(request, 'Please fill in all fields.')
     
     context = {
-        'config': config,
         'page_title': 'Contact'
     }
-    return render(request, 'home/contact.html', context)
\ No newline at end of file
+    return render(request, 'home/contact.html', context)
+
+def contact_throttled(request, retry_after):
+    """429 answer for a contact POST over its rate limit"""
+    messages.error(request, 'You have sent several messages in a short time. Please try again a little later.')
+    response = render(request, 'home/contact.html', {'page_title': 'Contact'}, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
\ No newline at end of file
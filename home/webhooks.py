@@ -1,19 +1,34 @@
+"""GitHub webhook receiver; deliveries are stored and applied later by the background worker."""
+import hashlib
+import hmac
+import json
+import traceback
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F, Q
 from django.http import HttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django.conf import settings
-import json
-import hmac
-import hashlib
-from home.models import Project
-from datetime import datetime
+
+from .github import GitHubClient
+from .github_sync import RepositorySync, repository_slug
+from .jobs import JOB_MAX_ATTEMPTS, JOB_TIMEOUT, enqueue, task
+from .models import GitHubRepository, Project, WebhookDelivery
+
+# Events that can change a project; anything else (e.g. ping) is acknowledged and dropped
+HANDLED_EVENTS = ('repository', 'push')
+
+GITHUB_PUSH_DEBOUNCE = getattr(settings, 'GITHUB_PUSH_DEBOUNCE', 60)
+GITHUB_PUSH_MAX_BATCH = getattr(settings, 'GITHUB_PUSH_MAX_BATCH', 20)
+
 
 @csrf_exempt
 @require_POST
 def github_webhook(request):
-    """
-    GitHub webhook handler to automatically add new repositories to portfolio
-    """
+    """Verify a GitHub webhook delivery and queue it for the worker"""
     # Verify webhook signature (optional but recommended)
     if hasattr(settings, 'GITHUB_WEBHOOK_SECRET'):
         signature = request.META.get('HTTP_X_HUB_SIGNATURE_256', '')
@@ -22,19 +37,30 @@ def github_webhook(request):
     
     try:
         payload = json.loads(request.body)
-        event_type = request.META.get('HTTP_X_GITHUB_EVENT', '')
-        
-        if event_type == 'repository':
-            handle_repository_event(payload)
-        elif event_type == 'push':
-            handle_push_event(payload)
-            
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return HttpResponse('Invalid JSON', status=400)
+    if not isinstance(payload, dict):
         return HttpResponse('Invalid JSON', status=400)
-    except Exception as e:
-        return HttpResponse(f'Error: {str(e)}', status=500)
     
-    return HttpResponse('OK', status=200)
+    event_type = request.META.get('HTTP_X_GITHUB_EVENT', '')
+    if event_type not in HANDLED_EVENTS:
+        return HttpResponse('OK', status=200)
+    
+    delivery_id = request.META.get('HTTP_X_GITHUB_DELIVERY') or hashlib.sha256(request.body).hexdigest()
+    repository = payload.get('repository') or {}
+    delivery, created = WebhookDelivery.objects.get_or_create(
+        delivery_id=delivery_id,
+        defaults={
+            'event': event_type,
+            'repo_id': repository.get('id') if isinstance(repository.get('id'), int) else None,
+            # Only what processing needs; push payloads can carry large commit lists
+            'payload': {'action': payload.get('action', ''), 'repository': repository},
+        },
+    )
+    if created:
+        schedule_delivery(delivery)
+    
+    return HttpResponse('Accepted', status=202)
 
 def verify_webhook_signature(payload, signature, secret):
     """Verify GitHub webhook signature"""
@@ -49,129 +75,121 @@ def verify_webhook_signature(payload, signature, secret):
     
     return hmac.compare_digest(signature, expected_signature)
 
-def handle_repository_event(payload):
-    """Handle repository creation/update events"""
-    action = payload.get('action')
-    repo = payload.get('repository', {})
-    
-    if action in ['created', 'publicized']:
-        add_repository_to_portfolio(repo)
-    elif action == 'deleted':
-        remove_repository_from_portfolio(repo)
-
-def handle_push_event(payload):
-    """Handle push events to update repository info"""
-    repo = payload.get('repository', {})
-    if repo:
-        update_repository_info(repo)
-
-def add_repository_to_portfolio(repo):
-    """Add a new repository to the portfolio"""
-    repo_name = repo['name']
-    repo_url = repo['html_url']
-    description = repo['description'] or f'A {repo["language"] or "software"} project'
-    
-    # Skip if it's a fork, private, or archived
-    if repo.get('fork') or repo.get('private') or repo.get('archived'):
-        return
-    
-    # Skip portfolio repo itself
-    if repo_name in ['bikalpokharel', 'PORTFOLIO']:
-        return
-    
-    # Create slug from repository name
-    slug = repo_name.lower().replace('_', '-').replace(' ', '-')
-    
-    # Check if project already exists
-    if Project.objects.filter(slug=slug).exists():
+def schedule_delivery(delivery):
+    if delivery.event != 'push' or delivery.repo_id is None or GITHUB_PUSH_DEBOUNCE <= 0:
+        enqueue(
+            'github.process_delivery',
+            key=f'webhook:{delivery.delivery_id}',
+            delivery_id=delivery.delivery_id,
+        )
         return
     
-    # Determine project type
-    project_type = determine_project_type(repo['language'], description)
-    
-    # Create project
-    project_data = {
-        'title': format_title(repo_name),
-        'slug': slug,
-        'description': description,
-        'detailed_description': create_detailed_description(repo),
-        'project_type': project_type,
-        'status': 'completed',
-        'github_url': repo_url,
-        'demo_url': '',
-        'is_featured': True,
-        'order': 0,
-    }
-    
-    Project.objects.create(**project_data)
+    waiting = WebhookDelivery.objects.filter(repo_id=delivery.repo_id, event='push', status='pending').count()
+    enqueue(
+        'github.process_pushes',
+        key=f'webhook:push:{delivery.repo_id}',
+        delay=0 if waiting >= GITHUB_PUSH_MAX_BATCH else GITHUB_PUSH_DEBOUNCE,
+        repo_id=delivery.repo_id,
+    )
 
-def remove_repository_from_portfolio(repo):
-    """Remove a repository from the portfolio"""
-    repo_name = repo['name']
-    slug = repo_name.lower().replace('_', '-').replace(' ', '-')
-    
-    try:
-        project = Project.objects.get(slug=slug)
-        project.delete()
-    except Project.DoesNotExist:
-        pass
-
-def update_repository_info(repo):
-    """Update repository information in the portfolio"""
-    repo_name = repo['name']
-    slug = repo_name.lower().replace('_', '-').replace(' ', '-')
+@task('github.process_pushes')
+def process_pushes(repo_id):
+    """
+    Apply the latest waiting push to a repository and mark the ones before it
+    merged, returning how many were merged.
+    """
+    waiting = list(
+        WebhookDelivery.objects.filter(repo_id=repo_id, event='push', status='pending')
+        .order_by('received_at', 'id')
+        .values_list('delivery_id', flat=True)
+    )
+    if not waiting:
+        return None
+    
+    *merged, latest = waiting
+    if merged:
+        WebhookDelivery.objects.filter(delivery_id__in=merged, status='pending').update(
+            status='merged', processed_at=timezone.now()
+        )
+    process_delivery(latest)
+    return len(merged)
+
+@task('github.process_delivery')
+def process_delivery(delivery_id):
+    """
+    Apply one stored delivery, at most once.
+
+    The delivery is claimed with a conditional ``UPDATE`` so a duplicate job
+    or a concurrent ``process_webhooks`` run finds nothing to do. Errors are
+    recorded on the delivery and re-raised for the job queue to retry; after
+    ``JOB_MAX_ATTEMPTS`` the delivery is marked failed.
+    """
+    claimed = WebhookDelivery.objects.filter(delivery_id=delivery_id, status='pending').update(
+        status='processing', attempts=F('attempts') + 1, claimed_at=timezone.now()
+    )
+    if not claimed:
+        return False
     
+    delivery = WebhookDelivery.objects.get(delivery_id=delivery_id)
     try:
-        project = Project.objects.get(slug=slug)
-        project.description = repo['description'] or project.description
-        project.detailed_description = create_detailed_description(repo)
-        project.save()
-    except Project.DoesNotExist:
-        pass
-
-def determine_project_type(language, description):
-    """Determine project type based on language and description"""
-    description_lower = description.lower()
-    
-    if any(word in description_lower for word in ['web', 'website', 'app', 'django', 'flask', 'react', 'vue', 'angular']):
-        return 'web_app'
-    elif any(word in description_lower for word in ['ml', 'machine learning', 'ai', 'artificial intelligence', 'data science', 'tensorflow', 'pytorch']):
-        return 'ml_project'
-    elif any(word in description_lower for word in ['mobile', 'android', 'ios', 'react native', 'flutter']):
-        return 'mobile_app'
-    elif any(word in description_lower for word in ['ai', 'artificial intelligence', 'chatbot', 'nlp']):
-        return 'ai_project'
-    elif any(word in description_lower for word in ['data', 'analysis', 'visualization', 'pandas', 'numpy']):
-        return 'data_science'
-    else:
-        return 'other'
-
-def format_title(repo_name):
-    """Format repository name into a proper title"""
-    title = repo_name.replace('_', ' ').replace('-', ' ')
-    title = ' '.join(word.capitalize() for word in title.split())
-    return title
-
-def create_detailed_description(repo):
-    """Create a detailed description for the project"""
-    language = repo['language'] or 'Various'
-    stars = repo['stargazers_count']
-    forks = repo['forks_count']
-    created = datetime.strptime(repo['created_at'], '%Y-%m-%dT%H:%M:%SZ').strftime('%B %Y')
-    updated = datetime.strptime(repo['updated_at'], '%Y-%m-%dT%H:%M:%SZ').strftime('%B %Y')
-    
-    description = f'''A {language} project created in {created} and last updated in {updated}.
-
-Repository Statistics:
-• ⭐ {stars} stars
-• 🍴 {forks} forks
-• 📅 Created: {created}
-• 🔄 Last updated: {updated}
+        apply_delivery(delivery)
+    except Exception:
+        delivery.status = 'failed' if delivery.attempts >= JOB_MAX_ATTEMPTS else 'pending'
+        delivery.last_error = traceback.format_exc()
+        delivery.save(update_fields=['status', 'last_error'])
+        raise
+    
+    delivery.status = 'done'
+    delivery.processed_at = timezone.now()
+    delivery.save(update_fields=['status', 'processed_at'])
+    return True
 
-Technologies: {language}
+def stalled_deliveries():
+    """Deliveries left 'processing' by a worker that died while applying them"""
+    cutoff = timezone.now() - timedelta(seconds=JOB_TIMEOUT)
+    return WebhookDelivery.objects.filter(status='processing').filter(
+        Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True)
+    )
 
-{repo['description'] or 'A software development project showcasing various programming concepts and best practices.'}
+def requeue_stalled_deliveries():
+    """Return abandoned deliveries to the inbox and queue them again"""
+    deliveries = list(stalled_deliveries())
+    WebhookDelivery.objects.filter(pk__in=[d.pk for d in deliveries], status='processing').update(status='pending')
+    for delivery in deliveries:
+        schedule_delivery(delivery)
+    return len(deliveries)
 
-Visit the GitHub repository for more details, documentation, and source code.'''
+def apply_delivery(delivery):
+    """Bring the project of the delivery's repository up to date"""
+    repo = delivery.payload.get('repository') or {}
+    if not repo.get('id'):
+        return
     
-    return description
+    if delivery.event == 'repository' and delivery.payload.get('action') == 'deleted':
+        remove_repository(repo)
+    else:
+        sync_repository(repo)
+
+def sync_repository(repo):
+    """Sync one repository as the API currently describes it"""
+    client = GitHubClient(token=getattr(settings, 'GITHUB_TOKEN', None))
+    try:
+        # Looked up by id, so a rename since the delivery was sent is followed
+        current = client.get_json(f'/repositories/{repo["id"]}')
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            # Deleted or made private in the meantime
+            return
+        raise
+    RepositorySync(client).run([current])
+
+def remove_repository(repo):
+    """Remove a deleted repository's project from the portfolio"""
+    state = GitHubRepository.objects.select_related('project').filter(repo_id=repo['id']).first()
+    if state is None:
+        # Projects that were never synced with state are matched by slug
+        Project.objects.filter(slug=repository_slug(repo['name']), github_repository__isnull=True).delete()
+        return
+    if state.project is not None:
+        state.project.delete()
+    state.delete()
@@ -50,6 +50,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'home.context_processors.site_config',
+                'home.context_processors.model_versions',
             ],
         },
     },
@@ -65,6 +67,50 @@ DATABASES = {
     }
 }
 
+# Cache
+# 'default' lives in each worker's memory; 'shared' is visible to every worker
+# on the host and holds the small version stamps used for invalidation.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    # Contact form rate limits; kept apart so a burst of keys cannot cull the version stamps,
+    # and large enough that culling does not reset the buckets being enforced or the counters
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'throttle',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+}
+VERSION_CACHE_ALIAS = 'shared'
+
+# Seconds a rendered public page is kept before it is rebuilt anyway
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Projects listing: 'cursor' pages by keyset, 'page' uses numbered pages
+PROJECTS_PAGINATION = 'cursor'
+# Show the (cached) total number of projects on the listing
+PROJECTS_SHOW_TOTAL = True
+
+# Static site export (see the export_static_site command)
+STATIC_EXPORT_ROOT = BASE_DIR / 'static_site'
+STATIC_EXPORT_HOST = 'Bikal.pythonanywhere.com'
+
+# Background jobs (see home/jobs.py and the run_worker command)
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 60  # seconds before the first retry, doubled for each further one
+JOB_POLL_INTERVAL = 5
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -132,8 +178,22 @@ LOGGING = {
     },
 }
 
+# Contact form emails: 'immediate' sends one per message, 'digest' batches everything received
+# within CONTACT_DIGEST_INTERVAL seconds of the first message into one email per 100 messages
+CONTACT_EMAIL_MODE = 'immediate'
+CONTACT_DIGEST_INTERVAL = 60 * 60
+
+# Contact form throttling: (burst, seconds per further message) per client IP and per sender email
+CONTACT_THROTTLE_IP = (5, 60)
+CONTACT_THROTTLE_EMAIL = (3, 5 * 60)
+CONTACT_DUPLICATE_WINDOW = 60 * 60  # identical messages from one address within this window are dropped
+CONTACT_THROTTLE_CACHE_ALIAS = 'throttle'  # shared by all workers
+CLIENT_IP_HEADER = 'HTTP_X_REAL_IP'  # set by the PythonAnywhere front end; use None when not behind a proxy that sets it
+
 # GitHub Webhook Settings
 GITHUB_WEBHOOK_SECRET = 'your-webhook-secret-here'  # Set this in production
+GITHUB_PUSH_DEBOUNCE = 60  # seconds to collect a burst of pushes to one repository before syncing it once
+GITHUB_PUSH_MAX_BATCH = 20  # sync right away once this many pushes are waiting
 
 # Security settings for production
 if not DEBUG:
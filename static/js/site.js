@@ -0,0 +1,153 @@
+// Initialize AOS
+AOS.init({
+    duration: 800,
+    once: true,
+    offset: 100
+});
+
+// Navbar scroll effect
+window.addEventListener('scroll', function() {
+    const navbar = document.querySelector('.navbar');
+    if (window.scrollY > 50) {
+        navbar.style.background = 'rgba(255, 255, 255, 0.98)';
+    } else {
+        navbar.style.background = 'rgba(255, 255, 255, 0.95)';
+    }
+});
+
+// Smooth scrolling for anchor links
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        const target = document.querySelector(this.getAttribute('href'));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+
+// Back to top button
+const toTopBtn = document.createElement('button');
+toTopBtn.setAttribute('type', 'button');
+toTopBtn.setAttribute('aria-label', 'Back to top');
+toTopBtn.style.position = 'fixed';
+toTopBtn.style.right = '20px';
+toTopBtn.style.bottom = '24px';
+toTopBtn.style.zIndex = '1030';
+toTopBtn.style.border = 'none';
+toTopBtn.style.width = '44px';
+toTopBtn.style.height = '44px';
+toTopBtn.style.borderRadius = '50%';
+toTopBtn.style.background = 'linear-gradient(135deg, var(--primary-color), var(--primary-dark))';
+toTopBtn.style.color = '#fff';
+toTopBtn.style.boxShadow = 'var(--shadow)';
+toTopBtn.style.cursor = 'pointer';
+toTopBtn.style.display = 'none';
+toTopBtn.innerHTML = '<i class="fas fa-arrow-up"></i>';
+document.body.appendChild(toTopBtn);
+
+window.addEventListener('scroll', function() {
+    toTopBtn.style.display = window.scrollY > 400 ? 'inline-flex' : 'none';
+    toTopBtn.style.alignItems = 'center';
+    toTopBtn.style.justifyContent = 'center';
+});
+
+toTopBtn.addEventListener('click', function() {
+    window.scrollTo({ top: 0, behavior: 'smooth' });
+});
+
+// Progress bar animation
+function animateProgressBars() {
+    const progressBars = document.querySelectorAll('.progress-bar-custom');
+    progressBars.forEach(bar => {
+        const percentage = bar.getAttribute('data-percentage');
+        if (percentage) {
+            bar.style.width = percentage + '%';
+        }
+    });
+}
+
+// Animate progress bars when they come into view
+const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            animateProgressBars();
+        }
+    });
+});
+
+document.querySelectorAll('.progress-custom').forEach(progress => {
+    observer.observe(progress);
+});
+
+// Animate skill level bars
+function animateSkillBars() {
+    const skillBars = document.querySelectorAll('.skill-level-fill');
+    skillBars.forEach(bar => {
+        const level = bar.getAttribute('data-level');
+        if (level) {
+            bar.style.width = level + '%';
+        }
+    });
+}
+
+// Animate skill bars when they come into view
+const skillObserver = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            setTimeout(() => {
+                animateSkillBars();
+            }, 300);
+        }
+    });
+});
+
+document.querySelectorAll('.skill-level-bar').forEach(skillBar => {
+    skillObserver.observe(skillBar);
+});
+
+// Counter animation
+function animateCounters() {
+    const counters = document.querySelectorAll('[data-counter]');
+    counters.forEach(counter => {
+        const target = parseInt(counter.getAttribute('data-counter'));
+        const duration = 2000;
+        let start = 0;
+        const increment = target / (duration / 16);
+
+        const timer = setInterval(() => {
+            start += increment;
+            counter.textContent = Math.floor(start);
+
+            if (start >= target) {
+                counter.textContent = target;
+                clearInterval(timer);
+            }
+        }, 16);
+    });
+}
+
+// Form validation
+document.querySelectorAll('form').forEach(form => {
+    form.addEventListener('submit', function(e) {
+        const requiredFields = form.querySelectorAll('[required]');
+        let isValid = true;
+
+        requiredFields.forEach(field => {
+            if (!field.value.trim()) {
+                field.classList.add('is-invalid');
+                isValid = false;
+            } else {
+                field.classList.remove('is-invalid');
+            }
+        });
+
+        if (!isValid) {
+            e.preventDefault();
+        }
+    });
+});